@@ -0,0 +1,113 @@
+# Mario
+# Date: 18 / oct / 2026
+
+"""
+Shared asset registry. Every image file is decoded only once and converted to
+the pixel format of the display, so that blitting it costs no conversion at
+all. Every consumer asking for the same file gets the very same Surface.
+Files can be decoded ahead of time by a pool of threads, while SDL and the
+display start; converting them is left to the main thread. With an asset
+bundle (bundle.py) the images come already decoded from its mapping instead.
+"""
+
+import os
+import pygame
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# files are found next to the game, wherever it is started from
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+""" Asset registry """
+class Assets():
+    def __init__(self):
+        # decoded images, exactly as they come out of the file
+        self.raw = {}
+        # display-ready images, keyed by (file name, alpha)
+        self.images = {}
+        # collision masks, keyed by file name
+        self.masks = {}
+        # seconds spent decoding and converting each file
+        self.decode_time = {}
+        self.convert_time = {}
+        # files being decoded by the thread pool
+        self.pending = {}
+        # memory-mapped bundle of decoded images, if there is one
+        self.bundle = None
+
+    def use(self, bundle):
+        self.bundle = bundle
+
+    def preload(self, names, workers=4):
+        # decode the files in threads, pygame lets go of the GIL meanwhile
+        names = [name for name in names
+                 if name not in self.raw and name not in self.pending
+                 and not (self.bundle and name in self.bundle)]
+        if not names:
+            return
+        pool = ThreadPoolExecutor(max_workers=workers)
+        for name in names:
+            self.pending[name] = pool.submit(self.load, name)
+        # the threads end once the queue is empty
+        pool.shutdown(wait=False)
+
+    def load(self, name):
+        start = time.perf_counter()
+        if self.bundle and name in self.bundle:
+            surface = self.bundle.image(name)
+        else:
+            surface = pygame.image.load(os.path.join(HERE, name))
+        return surface, time.perf_counter() - start
+
+    def decode(self, name):
+        # each file is read and decoded only the first time it is requested
+        if name in self.pending:
+            self.raw[name], self.decode_time[name] = \
+                self.pending.pop(name).result()
+        if name not in self.raw:
+            self.raw[name], self.decode_time[name] = self.load(name)
+        return self.raw[name]
+
+    def image(self, name, alpha=True):
+        # alpha=True keeps per-pixel transparency (sprites), alpha=False
+        # gives an opaque surface (background, floor)
+        key = (name, alpha)
+        if key not in self.images:
+            surface = self.decode(name)
+
+            # conversion needs a display mode, until then the raw image is
+            # handed out and it is not cached
+            if pygame.display.get_surface() is None:
+                return surface
+
+            start = time.perf_counter()
+            if alpha:
+                self.images[key] = surface.convert_alpha()
+            else:
+                self.images[key] = surface.convert()
+            self.convert_time[name] = (self.convert_time.get(name, 0)
+                                       + time.perf_counter() - start)
+        return self.images[key]
+
+    def mask(self, name):
+        # opaque pixels of the image, built from the decoded file so that it
+        # needs no display at all
+        if name not in self.masks:
+            self.masks[name] = pygame.mask.from_surface(self.decode(name))
+        return self.masks[name]
+
+    def report(self):
+        # one line per file with its decode and convert times in milliseconds
+        lines = []
+        for name in self.raw:
+            decode = self.decode_time[name] * 1000
+            convert = self.convert_time.get(name, 0) * 1000
+            lines.append('{:<18} decode {:7.2f} ms  convert {:7.2f} ms'
+                         .format(name, decode, convert))
+        total = (sum(self.decode_time.values())
+                 + sum(self.convert_time.values())) * 1000
+        lines.append('{:<18} total  {:7.2f} ms'.format('', total))
+        return '\n'.join(lines)
+
+""" Shared registry """
+assets = Assets()
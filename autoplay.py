@@ -0,0 +1,285 @@
+# Mario
+# Date: 18 / oct / 2026
+
+"""
+Lookahead autoplayer. The world is copied into a planning world
+(World.snapshot and World.restore) and futures are played there: the space
+bar down or up for a few steps at a time, which is enough to tap it, hold
+it to bounce, or let it go early, against the pipes to come, known since
+the random state is part of the copy. A depth first search looks for key
+states that keep Mario alive for a whole horizon ahead, and the plan is
+carried out step by step. As it gets shorter it is extended at its far end;
+when the far end leads nowhere, the later half of the plan is given up and
+searched again, then the later half of what is left, and so on. The planning
+world collides rectangles, which only ever touch earlier than the pixels, so
+what it survives the game survives too, under the very same keys.
+
+The search stops at a budget of milliseconds per frame and goes on from
+where it was on the next one, since the far end of the plan stays ahead of
+the game for a while; what the searches that are over kept is let go of on
+the same budget, a few items at a time. mario.py --autoplay plays attract
+mode; to check that the pipes of some seeds can be survived,
+headless:
+
+    python autoplay.py --seeds=0,1,2 --steps=20000 --budget=2
+"""
+
+import sys
+import time
+from collections import deque
+
+import simulation
+from options import option
+
+# steps the key stays down or up between two choices of the search
+SEGMENT = 4
+
+# steps after game over before a new game is started
+RESTART = 120
+
+# items of the litter let go of between two looks at the clock
+SWEEP = 16
+
+""" Autoplayer object """
+class Autoplayer():
+    def __init__(self, world, budget=0.002, horizon=160):
+        self.world = world
+        # the same rules, rectangles only, never drawn
+        self.planner = simulation.World()
+        # seconds of search per frame, and the steps a plan has to survive
+        self.budget = budget
+        self.horizon = horizon
+
+        # whether the space bar is down now
+        self.held = False
+        # key state for each of the next steps, and the step the first one
+        # is for; a mark (tick, snapshot, held) at the end of every segment
+        # of the plan that Mario lives through, to search again from
+        self.plan = deque()
+        self.planned = None
+        self.marks = deque()
+        # the search under way, from the mark at root, its nodes to visit
+        # and the states it has seen, and when it has to stop for this frame
+        self.searching = None
+        self.root = None
+        self.stack = []
+        self.seen = set()
+        self.deadline = 0
+        # stacks and seen sets of the searches that are over, let go of a
+        # few items at a time: all at once they can take longer than a frame
+        self.litter = []
+        # steps spent dead, before starting again
+        self.dead = 0
+
+        # steps simulated ahead and seconds spent on them, the longest frame
+        # of it, frames played and times the plan was cut back
+        self.simulated = 0
+        self.seconds = 0.0
+        self.slowest = 0.0
+        self.decisions = 0
+        self.cuts = 0
+
+    def search(self, root, segments):
+        # key states, one per step, that keep Mario alive for segments of
+        # SEGMENT steps from the root mark, the marks along them, and True;
+        # or, when none do, the ones that keep him alive the longest and
+        # False. A generator: when the deadline comes it gives the longest
+        # so far and None, and goes on when asked again
+        planner = self.planner
+        mario = planner.mario
+        longest = (-1, (), ())
+        # while Mario lives the pipes do not depend on him, so his state
+        # and the key tell the whole state of a step; many keys lead to the
+        # same one, and each is only searched from once
+        seen = self.seen
+        # nodes to visit: (mark, keys so far, marks so far, key)
+        _, _, held = root
+        stack = self.stack
+        stack += [(root, (), (), not held), (root, (), (), held)]
+        while stack:
+            if time.perf_counter() > self.deadline:
+                steps, keys, marks = longest
+                yield self.steps(keys, steps), marks, None
+            (_, snapshot, held), keys, marks, down = stack.pop()
+            planner.restore(snapshot)
+            if down and not held:
+                planner.press()
+            elif held and not down:
+                planner.release()
+            lived = 0
+            while lived < SEGMENT and planner.game_on:
+                planner.step()
+                lived += 1
+            del planner.sounds[:]
+            self.simulated += lived
+            keys += (down,)
+            steps = (len(keys) - 1) * SEGMENT + lived
+            if not planner.game_on:
+                if steps > longest[0]:
+                    longest = (steps, keys, marks)
+                continue
+            state = (planner.ticks, mario.rect.y, mario.amount, mario.jumping,
+                     mario.bounce, down)
+            if state in seen:
+                continue
+            seen.add(state)
+            mark = (planner.ticks, planner.snapshot(), down)
+            marks += (mark,)
+            if len(keys) == segments:
+                yield self.steps(keys, steps), marks, True
+                return
+            if steps > longest[0]:
+                longest = (steps, keys, marks)
+            # the key as it is first, then the other one
+            stack.append((mark, keys, marks, not down))
+            stack.append((mark, keys, marks, down))
+        steps, keys, marks = longest
+        yield self.steps(keys, steps), marks, False
+
+    def steps(self, keys, count):
+        # segment keys as one key state per step
+        return [down for down in keys for _ in range(SEGMENT)][:max(count, 0)]
+
+    def extend(self, deadline):
+        # a plan for the whole horizon, searched from the end of the one at
+        # hand, or from the current step when there is none
+        start = time.perf_counter()
+        self.deadline = deadline or start + self.budget
+        world = self.world
+        while self.marks and self.marks[0][0] <= world.ticks:
+            self.marks.popleft()
+        # a search from a mark that is no longer the end of the plan is over
+        if self.searching and not (self.marks and self.marks[-1] is self.root):
+            self.drop()
+
+        while len(self.plan) < self.horizon:
+            if time.perf_counter() > self.deadline:
+                break
+            if self.searching is None:
+                if self.marks:
+                    self.root = self.marks[-1]
+                else:
+                    self.root = (world.ticks, world.snapshot(), self.held)
+                    self.plan.clear()
+                segments = -(-(self.horizon - len(self.plan)) // SEGMENT)
+                self.searching = self.search(self.root, segments)
+            keys, marks, found = next(self.searching)
+            if found is None and self.marks:
+                # the end of the plan is still ahead, the search goes on
+                # from there on the next frame
+                break
+            self.drop()
+            if found is None:
+                # from the current step, which will be gone by then: the
+                # steps Mario lives through are kept
+                self.plan.extend(keys[:len(marks) * SEGMENT])
+                self.marks.extend(marks)
+                break
+            if found or not self.marks:
+                # all the way, or, with no way through from the current
+                # step, living as long as possible
+                self.plan.extend(keys)
+                self.marks.extend(marks)
+            else:
+                self.cut()
+        # what is left of the budget
+        self.sweep()
+        elapsed = time.perf_counter() - start
+        self.seconds += elapsed
+        self.slowest = max(self.slowest, elapsed)
+
+    def drop(self):
+        # the search is over; what it kept goes to the litter
+        self.searching = None
+        self.litter += [self.stack, self.seen]
+        self.stack, self.seen = [], set()
+
+    def sweep(self):
+        # let go of the litter until the deadline, a few items at a time
+        litter = self.litter
+        while litter and time.perf_counter() < self.deadline:
+            items = litter[-1]
+            for _ in range(SWEEP):
+                if not items:
+                    litter.pop()
+                    break
+                items.pop()
+
+    def cut(self):
+        # the later half of the plan is given up, to be searched again
+        self.cuts += 1
+        keep = len(self.marks) // 2
+        while len(self.marks) > keep:
+            self.marks.pop()
+        steps = self.marks[-1][0] - self.world.ticks if self.marks else 0
+        while len(self.plan) > steps:
+            self.plan.pop()
+
+    def play(self, press, release, deadline=None):
+        # the key state for this step, carried out with press() and
+        # release(), which also go on a tape when recording. The search
+        # stops at deadline, when the steps of a frame share one, else after
+        # the budget
+        world = self.world
+        if not world.game_on:
+            # attract mode: a new game after a while
+            self.plan.clear()
+            self.marks.clear()
+            self.dead += 1
+            if self.dead >= RESTART:
+                self.dead = 0
+                if self.held:
+                    release()
+                press()
+                release()
+                self.held = False
+            return
+
+        # a plan made for another step (a restored checkpoint, a key pressed
+        # by hand) is of no use
+        if self.planned != world.ticks:
+            self.plan.clear()
+            self.marks.clear()
+        if len(self.plan) < self.horizon or self.litter:
+            self.extend(deadline)
+        self.decisions += 1
+        down = self.plan.popleft() if self.plan else self.held
+        self.planned = world.ticks + 1
+        if down and not self.held:
+            press()
+        elif self.held and not down:
+            release()
+        self.held = down
+
+    def report(self):
+        rate = self.simulated / self.seconds if self.seconds else 0
+        return ('{} decisions, {} cuts, {} steps simulated ahead, {:.0f} '
+                'simulated steps per second, {:.3f} ms per decision, {:.3f} '
+                'at most'.format(self.decisions, self.cuts, self.simulated,
+                                 rate, self.seconds /
+                                 max(self.decisions, 1) * 1000,
+                                 self.slowest * 1000))
+
+if __name__ == '__main__':
+    seeds = [int(seed) for seed in option('seeds', '0,1,2').split(',')]
+    steps = option('steps', 20000)
+    budget = option('budget', 2.0) / 1000
+    masks = None
+    if '--masks' in sys.argv:
+        from masks import Masks
+        masks = Masks()
+
+    for seed in seeds:
+        world = simulation.World(seed, masks=masks)
+        player = Autoplayer(world, budget)
+        start = time.perf_counter()
+        while world.ticks < steps:
+            player.play(world.press, world.release)
+            world.step()
+            world.sounds.clear()
+        seconds = time.perf_counter() - start
+        print('seed {}: {} deaths in {} steps, best {}, {:.0f} steps per '
+              'second'.format(seed, world.high.games, steps,
+                              max(world.best, world.current),
+                              steps / seconds))
+        print('    ' + player.report())
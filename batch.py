@@ -0,0 +1,128 @@
+# Mario
+# Date: 18 / oct / 2026
+
+"""
+Plays many headless games of the simulation at once, faster than real time,
+spread over a pool of processes. Every game is given a seed and an input
+policy, and the results come back as columns:
+
+    python batch.py --games=10000 --policy=jumper --workers=8
+"""
+
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import simulation
+from simulation import PIPE_SIZES
+from options import option
+
+# cause of death when the game ran out of steps instead of hitting a pipe,
+# otherwise the cause is the kind of the pipe Mario ran into
+TIMEOUT = -1
+
+# the columns of the results, all of them integers
+COLUMNS = ('seed', 'score', 'frames', 'cause')
+
+""" Policies """
+# a policy looks at the world and says whether the space bar is held down
+
+def idle(world, rng):
+    return False
+
+def mash(world, rng):
+    # hold and release the space bar at random
+    return rng.random() < 0.5
+
+def jumper(world, rng):
+    # hold the space bar while a pipe is getting close to Mario
+    mario = world.mario.rect
+    lead = 6 * world.speed
+    for kind, last_x, x, y in world.pipes.sprites():
+        if x + PIPE_SIZES[kind][0] > mario.x and x < mario.right + lead:
+            return True
+    return False
+
+POLICIES = {'idle': idle, 'mash': mash, 'jumper': jumper}
+
+""" Games """
+def cause(world):
+    # kind of the pipe Mario is overlapping, right after he crashed
+    mario = world.mario.rect
+    for kind, last_x, x, y in world.pipes.sprites():
+        w, h = PIPE_SIZES[kind]
+        if (mario.x < x + w and x < mario.right and
+                mario.y < y + h and y < mario.bottom):
+            return kind
+    return TIMEOUT
+
+def play(seed, policy, limit):
+    # one game, from the first step until Mario crashes or limit steps
+    world = simulation.World(seed)
+    rng = random.Random(~seed)
+    held = False
+    while world.ticks < limit:
+        hold = policy(world, rng)
+        if hold and not held:
+            world.press()
+        elif held and not hold:
+            world.release()
+        held = hold
+
+        world.step()
+        world.sounds.clear()
+        if not world.game_on:
+            return world.current, world.ticks, cause(world)
+    return world.current, world.ticks, TIMEOUT
+
+def play_many(seeds, name, limit):
+    # the work of one process, the results of all its games as columns
+    policy = POLICIES[name]
+    results = {column: array('q') for column in COLUMNS}
+    for seed in seeds:
+        score, frames, died = play(seed, policy, limit)
+        results['seed'].append(seed)
+        results['score'].append(score)
+        results['frames'].append(frames)
+        results['cause'].append(died)
+    return results
+
+def run(seeds, name='jumper', limit=120 * 60 * 5, workers=None, chunk=64):
+    # games are sent to the processes in chunks, so that each process
+    # plays many games per round trip
+    seeds = list(seeds)
+    chunks = [seeds[i:i + chunk] for i in range(0, len(seeds), chunk)]
+    results = {column: array('q') for column in COLUMNS}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [pool.submit(play_many, part, name, limit) for part in chunks]
+        # results keep the order of the seeds
+        for job in jobs:
+            part = job.result()
+            for column in COLUMNS:
+                results[column].extend(part[column])
+    return results
+
+""" Command line """
+if __name__ == '__main__':
+    games = option('games', 1000)
+    name = option('policy', 'jumper')
+    workers = option('workers', 0) or None
+    limit = option('limit', 120 * 60 * 5)
+
+    start = time.perf_counter()
+    results = run(range(games), name, limit, workers)
+    seconds = time.perf_counter() - start
+
+    frames = sum(results['frames'])
+    deaths = {}
+    for died in results['cause']:
+        deaths[died] = deaths.get(died, 0) + 1
+    print('{} games of {} in {:.2f} s, {:.0f} steps per second'
+          .format(games, name, seconds, frames / seconds))
+    print('mean score {:.1f}, best score {}, mean frames {:.1f}'
+          .format(sum(results['score']) / games, max(results['score']),
+                  frames / games))
+    for died in sorted(deaths):
+        label = 'timeout' if died == TIMEOUT else 'pipe {}'.format(died)
+        print('{:<10} {}'.format(label, deaths[died]))
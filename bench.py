@@ -0,0 +1,265 @@
+# Mario
+# Date: 18 / oct / 2026
+
+"""
+Headless benchmark of every version of the game. Each version runs in its own
+process with SDL's dummy video and audio drivers for a fixed number of
+frames, with the same scripted space bar presses and the same random seed.
+Clocks and timers are simulated at 120 frames per second, so nothing waits
+and every run sees the same events. The results come out as JSON:
+
+    python bench.py --frames=3000 --out=bench.json
+    python bench.py 5_sound_and_score.py "mario.py --dirty"
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from options import option
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+VARIANTS = ('1_game_off.py', '2_game_on.py', '3_bounce.py',
+            '4_pipe_control.py', '5_sound_and_score.py', '6_difficulty.py',
+            'step_by_step.py', 'mario.py', 'mario.py --dirty')
+
+# methods timed as stages: (class, method, stage)
+STAGES = (('Background', 'update', 'background'),
+          ('Floor', 'update', 'floor'),
+          ('Score', 'update', 'score'),
+          ('Pipe', 'update', 'pipes'),
+          ('Pipes', 'blits', 'pipes'),
+          ('Mario', 'update', 'mario'),
+          ('Mario', 'blits', 'mario'),
+          ('World', 'step', 'rules'))
+
+FPS = 120
+
+def script(frames, seed):
+    # frame -> 'down' or 'up', the same presses for every version: the space
+    # bar is held for a few frames every now and then
+    rng = random.Random(seed)
+    keys = {}
+    frame = rng.randrange(30, 90)
+    while frame < frames:
+        keys[frame] = 'down'
+        frame += rng.randrange(2, 40)
+        keys[frame] = 'up'
+        frame += rng.randrange(20, 120)
+    return keys
+
+def summary(values):
+    # mean, p50, p95, p99 and max in milliseconds
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    stats = {'mean': sum(ordered) / len(ordered) * 1000}
+    for name, p in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99),
+                    ('max', 1.0)):
+        stats[name] = ordered[int(last * p)] * 1000
+    return stats
+
+""" Child process """
+def child(path, args, frames, seed, result, memory=False):
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+    import resource
+    import tracemalloc
+    import pygame
+
+    real = time.perf_counter
+    keys = script(frames, seed)
+    timers = {}                 # event type -> [period ms, next ms]
+    frame = [0]                 # frames drawn so far
+    now = [0.0]                 # simulated seconds
+    spent = {}                  # stage -> seconds this frame
+    totals = {}                 # stage -> seconds of every frame
+    started = [None]
+    served = [-1]               # last frame the script's keys were sent on
+
+    def timed(function, stage):
+        def wrapper(*args, **kwargs):
+            start = real()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                spent[stage] = spent.get(stage, 0) + real() - start
+        return wrapper
+
+    # the game sees simulated time, so it never waits and never drifts
+    time.perf_counter = lambda: now[0]
+
+    def set_timer(event, millis, *args):
+        if millis:
+            timers[event] = [millis, millis]
+        else:
+            timers.pop(event, None)
+
+    get = pygame.event.get
+
+    def events(*args, **kwargs):
+        queue = get(*args, **kwargs)
+        millis = frame[0] * 1000 / FPS
+        for event, timer in timers.items():
+            while timer[1] <= millis:
+                queue.append(pygame.event.Event(event))
+                timer[1] += timer[0]
+        # the script's keys come once per frame, however often it asks
+        key = keys.get(frame[0]) if served[0] != frame[0] else None
+        served[0] = frame[0]
+        if key == 'down':
+            queue.append(pygame.event.Event(pygame.KEYDOWN,
+                                            key=pygame.K_SPACE))
+        elif key == 'up':
+            queue.append(pygame.event.Event(pygame.KEYUP, key=pygame.K_SPACE))
+        if frame[0] >= frames:
+            queue.append(pygame.event.Event(pygame.QUIT))
+        return queue
+
+    class Clock():
+        def tick(self, *args):
+            # a frame runs from one tick to the next
+            end = real()
+            if started[0] is None:
+                started[0] = end
+            else:
+                totals.setdefault('frame', []).append(end - spent.pop('frame'))
+            for stage, seconds in spent.items():
+                totals.setdefault(stage, []).append(seconds)
+            spent.clear()
+            frame[0] += 1
+            # a pacer waiting on its own deadline got there already
+            now[0] = max(now[0], frame[0] / FPS)
+            spent['frame'] = real()
+            return 1000 // FPS
+
+        # the busy loop is the same wait on a simulated clock
+        tick_busy_loop = tick
+
+        def get_fps(self):
+            return FPS
+
+    set_mode = pygame.display.set_mode
+    # the globals the game runs in
+    module = {'__name__': '__main__', '__file__': path}
+
+    def wrap_stages(*args, **kwargs):
+        # the classes of the game exist by the time the screen is made,
+        # whether the game or a module of its own (pacing.py) makes it
+        for name, method, stage in STAGES:
+            owner = module.get(name)
+            if owner is None and name == 'World' and 'simulation' in module:
+                owner = module['simulation'].World
+            if isinstance(owner, type) and method in owner.__dict__:
+                setattr(owner, method, timed(owner.__dict__[method], stage))
+        return set_mode(*args, **kwargs)
+
+    def wait(*args):
+        # the game waits for a key when nothing moves; here one frame passes
+        # and whatever the script has for it comes
+        queue = events()
+        for event in queue[1:]:
+            pygame.event.post(event)
+        return queue[0] if queue else pygame.event.Event(pygame.NOEVENT)
+
+    pygame.event.get = timed(events, 'events')
+    pygame.event.wait = wait
+    pygame.time.set_timer = set_timer
+    pygame.time.Clock = Clock
+    pygame.display.set_mode = wrap_stages
+    pygame.display.flip = timed(pygame.display.flip, 'display')
+    pygame.display.update = timed(pygame.display.update, 'display')
+
+    def until(pacer, deadline):
+        # the precise pacer's deadline comes at once on the simulated clock
+        now[0] = max(now[0], deadline)
+
+    sys.path.insert(0, HERE)
+    import pacing
+    pacing.Pacer.until = until
+
+    random.seed(seed)
+    # scripted games stay out of the kiosk's high score log, unless the
+    # variant names one itself
+    sys.argv = [path] + args + ['--scores=']
+    # tracing every allocation slows Python far more than blits, so peak
+    # memory is taken on a run of its own and this one is not timed
+    if memory:
+        tracemalloc.start()
+    try:
+        with open(path) as file:
+            code = compile(file.read(), path, 'exec')
+        exec(code, module)
+    except SystemExit:
+        pass
+    seconds = real() - started[0]
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        with open(result, 'w') as file:
+            json.dump({'peak_python_kb': peak // 1024}, file)
+        return
+
+    # the time of a frame not spent in any stage is drawing done by pygame
+    # directly (blits) and the loop itself
+    stages = {stage: summary(values) for stage, values in totals.items()}
+
+    report = {'frames': frame[0], 'seconds': seconds,
+              'fps': frame[0] / seconds, 'stages': stages,
+              'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+    with open(result, 'w') as file:
+        json.dump(report, file)
+
+""" Parent process """
+def run(variant, frames, seed):
+    # a timed run, then a run that traces the memory it allocates
+    report = spawn(variant, frames, seed)
+    report.update(spawn(variant, frames, seed, ['--memory']))
+    return report
+
+def spawn(variant, frames, seed, flags=()):
+    path, *args = variant.split()
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as file:
+        result = file.name
+    try:
+        command = [sys.executable, '-W', 'ignore', os.path.abspath(__file__),
+                   '--child', path, '--frames={}'.format(frames),
+                   '--seed={}'.format(seed), '--result={}'.format(result)]
+        command += list(flags) + ['--'] + args
+        subprocess.run(command, cwd=HERE, check=True,
+                       stdout=subprocess.DEVNULL)
+        with open(result) as file:
+            return json.load(file)
+    finally:
+        os.remove(result)
+
+if __name__ == '__main__':
+    frames = option('frames', 3000)
+    seed = option('seed', 0)
+
+    if '--child' in sys.argv:
+        split = sys.argv.index('--')
+        path = sys.argv[sys.argv.index('--child') + 1]
+        child(path, sys.argv[split + 1:], frames, seed, option('result', ''),
+              '--memory' in sys.argv[:split])
+        sys.exit()
+
+    variants = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    results = {}
+    for variant in variants or VARIANTS:
+        results[variant] = run(variant, frames, seed)
+        print('{:<24} {:9.1f} fps'.format(variant, results[variant]['fps']),
+              file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    out = option('out', '')
+    if out:
+        with open(out, 'w') as file:
+            file.write(text)
+    else:
+        print(text)
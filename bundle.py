@@ -0,0 +1,129 @@
+# Mario
+# Date: 18 / oct / 2026
+
+"""
+Single-file asset bundle. The build step decodes every PNG and WAV of the
+game once and packs the raw RGBA pixels and the mixer-format PCM samples into
+assets.bundle, behind an index. At runtime the bundle is memory-mapped and
+the images are made straight on top of the mapping with
+pygame.image.frombuffer, so nothing is decoded on launch. Each entry keeps
+the size and modification time of its file; a file edited since the build is
+loaded from the file again, until the bundle is rebuilt:
+
+    python bundle.py          # writes assets.bundle next to the game
+"""
+
+import json
+import mmap
+import os
+import struct
+
+import pygame
+
+from simulation import IMAGES, SOUNDS
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PATH = os.path.join(HERE, 'assets.bundle')
+
+# file layout: magic, index length, index (JSON), then the aligned buffers
+MAGIC = b'MARIOBN1'
+HEADER = struct.Struct('<8sI')
+ALIGN = 16
+
+# the mixer format the samples are stored in, as in mario.py
+MIXER = (44100, -16, 2)
+
+def source(file):
+    # what tells an edited file apart: its size and modification time
+    stat = os.stat(file)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def build(path=PATH, folder=HERE):
+    # decode every image and sound of the game and pack them; the mixer
+    # only converts here, it needs no sound card
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    pygame.mixer.pre_init(*MIXER, 512)
+    pygame.mixer.init()
+    index = {}
+    buffers = []
+    offset = 0
+    for name in sorted(IMAGES + tuple(SOUNDS.values())):
+        file = os.path.join(folder, name)
+        if name.endswith('.png'):
+            surface = pygame.image.load(file)
+            data = pygame.image.tobytes(surface, 'RGBA')
+            entry = {'kind': 'image', 'size': list(surface.get_size())}
+        else:
+            data = pygame.mixer.Sound(file).get_raw()
+            entry = {'kind': 'sound', 'mixer': list(pygame.mixer.get_init())}
+        entry['source'] = source(file)
+        entry['offset'] = offset
+        entry['length'] = len(data)
+        index[name] = entry
+        padding = -len(data) % ALIGN
+        buffers.append(data + bytes(padding))
+        offset += len(data) + padding
+
+    text = json.dumps(index).encode()
+    text += b' ' * (-(HEADER.size + len(text)) % ALIGN)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, len(text)))
+        file.write(text)
+        for data in buffers:
+            file.write(data)
+    return index
+
+""" Bundle object """
+class Bundle():
+    def __init__(self, path=PATH):
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, length = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise ValueError('{} is not an asset bundle'.format(path))
+        self.index = json.loads(bytes(self.map[HEADER.size:
+                                               HEADER.size + length]))
+        # buffers start right after the index
+        self.base = HEADER.size + length
+        self.view = memoryview(self.map)
+        # the files the entries were made from
+        self.folder = os.path.dirname(os.path.abspath(path))
+
+    def __contains__(self, name):
+        # only entries still made from the file as it is now; without the
+        # file (a kiosk shipped with the bundle alone) the entry is all there
+        # is
+        if name not in self.index:
+            return False
+        file = os.path.join(self.folder, name)
+        if not os.path.exists(file):
+            return True
+        return source(file) == self.index[name].get('source')
+
+    def buffer(self, name):
+        entry = self.index[name]
+        start = self.base + entry['offset']
+        return self.view[start:start + entry['length']]
+
+    def image(self, name):
+        # a surface sharing the mapped pixels, nothing is copied
+        return pygame.image.frombuffer(self.buffer(name),
+                                       self.index[name]['size'], 'RGBA')
+
+    def sound(self, name):
+        # the samples are already in the mixer format; the mixer keeps its
+        # own copy of them. None when the mixer was opened differently
+        if list(pygame.mixer.get_init()) != self.index[name]['mixer']:
+            return None
+        return pygame.mixer.Sound(buffer=self.buffer(name))
+
+def load(path=PATH):
+    # the bundle if it was built, None otherwise
+    if os.path.exists(path):
+        return Bundle(path)
+    return None
+
+if __name__ == '__main__':
+    index = build()
+    size = os.path.getsize(PATH)
+    print('{} files, {:.0f} KB in {}'.format(len(index), size / 1024, PATH))
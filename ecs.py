@@ -0,0 +1,445 @@
+# Mario
+# Date: 18 / oct / 2026
+
+"""
+Entity-component core of the rules. Entities are rows; entities with the
+same components share an archetype, which keeps one NumPy array per field
+of those components. Systems (gravity, scroll, cull, collide, animate,
+render) go over every archetype holding the components they need, a whole
+array at a time, so a new kind of entity is a new archetype and not a new
+class with its own update method. The rules are those of simulation.World,
+step for step; compare the two with:
+
+    python ecs.py --steps=20000
+"""
+
+import random
+import sys
+import time
+
+import numpy as np
+
+import simulation
+from simulation import (WIDTH, FLOOR_TOP, MARIO_TOP, INIT_SPEED, DAMPENING,
+                        SPRITES, STAGES, MARIO_SIZE, PIPE_IMAGES, PIPE_SIZES,
+                        PIPE_TICKS, SCORE_TICKS, MARIO_X, HOP, GRAVITY,
+                        FACTOR, Scheduler, HighScores)
+from options import option
+
+# fields of every component and their types
+COMPONENTS = {
+    'position': {'x': np.int64, 'y': np.int64,
+                 'last_x': np.int64, 'last_y': np.int64},
+    # vx is in units of the stage speed, vy in pixels per step
+    'velocity': {'vx': np.int64, 'vy': np.float64},
+    'sprite': {'image': np.int64},
+    'collider': {'w': np.int64, 'h': np.int64},
+    # frame goes up by rate every step and starts over at frames
+    'animation': {'frame': np.float64, 'rate': np.float64,
+                  'frames': np.int64},
+    # Mario's own state: pose, jumping and bounce
+    'jumper': {'pose': np.int64, 'jumping': np.bool_, 'bounce': np.bool_},
+    # distance after which a scrolling entity starts over, 0 for never
+    'wrap': {'wrap': np.int64},
+}
+
+# the entities of the game and their components
+ARCHETYPES = {
+    'background': ('position', 'sprite'),
+    'floor': ('position', 'velocity', 'sprite', 'wrap'),
+    'pipe': ('position', 'velocity', 'sprite', 'collider'),
+    'mario': ('position', 'velocity', 'sprite', 'collider', 'animation',
+              'jumper'),
+}
+
+# images are referred to by their index in IMAGES
+SPRITE_IMAGES = ("walk1.png", "walk2.png", "walk3.png")
+IMAGES = SPRITE_IMAGES + ("dead.png", "background.png",
+                          "floor.png") + PIPE_IMAGES
+DEAD = IMAGES.index("dead.png")
+AIRBORNE = IMAGES.index("walk3.png")
+PIPES = IMAGES.index(PIPE_IMAGES[0])
+
+# poses of a jumper
+RUN, JUMP, DIED = 0, 1, 2
+POSES = ('run', 'airborne', 'dead')
+
+def to_pixel(values):
+    # pygame rounds halves away from zero when a float lands in a Rect
+    return np.trunc(values + np.copysign(0.5, values)).astype(np.int64)
+
+""" Archetype object """
+class Archetype():
+    def __init__(self, components, capacity=16):
+        self.components = frozenset(components)
+        # entities are always the first count rows
+        self.count = 0
+        self.arrays = {}
+        for component in components:
+            for field, dtype in COMPONENTS[component].items():
+                self.arrays[field] = np.zeros(capacity, dtype=dtype)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, field):
+        # the field of every entity, a view that can be written to
+        return self.arrays[field][:self.count]
+
+    def __setitem__(self, field, values):
+        self.arrays[field][:self.count] = values
+
+    def has(self, components):
+        return self.components.issuperset(components)
+
+    def add(self, **values):
+        # a new entity, the fields not given are zero
+        if self.count == len(self.arrays['x']):
+            for field, old in self.arrays.items():
+                new = np.zeros(2 * len(old), dtype=old.dtype)
+                new[:self.count] = old[:self.count]
+                self.arrays[field] = new
+        row = self.count
+        for field, array in self.arrays.items():
+            array[row] = values.get(field, 0)
+        self.count += 1
+        return row
+
+    def keep(self, alive):
+        # drop the entities where alive is False, the others keep their order
+        kept = int(np.count_nonzero(alive))
+        if kept < self.count:
+            for array in self.arrays.values():
+                array[:kept] = array[:self.count][alive]
+            self.count = kept
+
+    def clear(self):
+        self.count = 0
+
+""" Systems """
+def images(group):
+    # the image a jumper shows: its running sprite, airborne or dead
+    pose = group['pose']
+    return np.where(pose == RUN, group['frame'].astype(np.int64),
+                    np.where(pose == JUMP, AIRBORNE, DEAD))
+
+def gravity(world):
+    # pull every jumper down, then run, bounce or land
+    for group in world.having('position', 'velocity', 'jumper', 'animation'):
+        vy, y = group['vy'], group['y']
+        vy += GRAVITY
+        y[:] = to_pixel(y + vy)
+
+        # the running ones stay on the ground and go through their sprites
+        jumping, bounce = group['jumping'], group['bounce']
+        run = ~jumping
+        y[run] = MARIO_TOP
+        group['pose'][run] = RUN
+        group['rate'][:] = np.where(run, DAMPENING, 0)
+
+        # going down and back to the ground: bounce or land
+        ground = jumping & (vy > 0) & (y >= MARIO_TOP)
+        again = ground & bounce
+        vy[again] = 0.0 - HOP
+        world.sounds.extend(['jump'] * int(np.count_nonzero(again)))
+        land = ground & ~bounce
+        jumping[land] = False
+        vy[land] = 0
+        y[land] = MARIO_TOP
+        group['frame'][land] = 0
+        group['pose'][land] = RUN
+
+def scroll(world):
+    # everything with a horizontal velocity moves with the stage speed
+    for group in world.having('position', 'velocity'):
+        group['x'] += group['vx'] * world.speed
+    for group in world.having('position', 'wrap'):
+        x, wrap = group['x'], group['wrap']
+        x[x <= -wrap] = 0
+
+def cull(world):
+    # obstacles leave once entirely out of the screen, or all of them at
+    # once after Mario dies
+    for group in world.obstacles():
+        if world.game_on:
+            group.keep(group['x'] + group['w'] > 0)
+        else:
+            group.clear()
+
+def collide(world):
+    # every jumper against every obstacle, a whole array at a time; masks
+    # have the last word on the rects that overlap
+    for group in world.having('position', 'collider', 'jumper'):
+        for row in range(len(group)):
+            mx, my = group['x'][row], group['y'][row]
+            mw, mh = group['w'][row], group['h'][row]
+            hits = 0
+            image = int(images(group)[row])
+            for obstacles in world.obstacles():
+                x, y = obstacles['x'], obstacles['y']
+                w, h = obstacles['w'], obstacles['h']
+                overlap = ((mx < x + w) & (x < mx + mw) &
+                           (my < y + h) & (y < my + mh))
+                if world.masks is None:
+                    hits += int(np.count_nonzero(overlap))
+                    continue
+                mask = world.mask(image)
+                for i in np.flatnonzero(overlap).tolist():
+                    other = world.mask(obstacles['image'][i])
+                    offset = (int(x[i] - mx), int(y[i] - my))
+                    if mask.overlap(other, offset) is not None:
+                        hits += 1
+            if hits:
+                world.sounds.extend(['crash'] * hits)
+                world.game_on = False
+                group['jumping'][row] = False
+                group['pose'][row] = DIED
+
+def animate(world):
+    # frames go round while the game is on; jumpers show their pose
+    for group in world.having('sprite', 'animation'):
+        frame = group['frame']
+        if world.game_on:
+            frame += group['rate']
+            frame[frame >= group['frames']] = 0
+        if group.has(('jumper',)):
+            group['image'][:] = images(group)
+
+def render(world, alpha=1.0):
+    # (image name, x, y) of everything on screen, back to front, alpha of
+    # the way from the last step to this one
+    blits = []
+    for name in ('background', 'floor', 'pipe', 'mario'):
+        group = world.archetypes[name]
+        if not len(group):
+            continue
+        if alpha == 1.0:
+            x, y = group['x'].tolist(), group['y'].tolist()
+        else:
+            x = group['last_x'] + alpha * (group['x'] - group['last_x'])
+            y = group['last_y'] + alpha * (group['y'] - group['last_y'])
+            x, y = to_pixel(x).tolist(), to_pixel(y).tolist()
+        images = group['image'].tolist()
+        wraps = group['wrap'].tolist() if 'wrap' in group.components else None
+        for i, image in enumerate(images):
+            blits.append((IMAGES[image], x[i], y[i]))
+            # a wrapping entity is drawn again right after itself
+            if wraps:
+                blits.append((IMAGES[image], x[i] + wraps[i], y[i]))
+    return blits
+
+# the systems of a step, in order, and those that still run while Mario
+# is dead
+SYSTEMS = (scroll, cull, collide, gravity, animate)
+ALWAYS = (cull, collide, animate)
+
+""" World object """
+class World():
+    def __init__(self, seed=None, masks=False):
+        self.random = random.Random(seed)
+        self.archetypes = {name: Archetype(components)
+                           for name, components in ARCHETYPES.items()}
+        # components -> archetypes holding them, worked out once
+        self.queries = {}
+        # pixel-accurate collision when masks is True
+        self.masks = {} if masks else None
+
+        self.archetypes['background'].add(image=IMAGES.index("background.png"))
+        self.archetypes['floor'].add(y=FLOOR_TOP, last_y=FLOOR_TOP, vx=-1,
+                                     image=IMAGES.index("floor.png"),
+                                     wrap=WIDTH)
+        self.archetypes['mario'].add(x=MARIO_X, last_x=MARIO_X, y=MARIO_TOP,
+                                     last_y=MARIO_TOP, w=MARIO_SIZE[0],
+                                     h=MARIO_SIZE[1], bounce=True,
+                                     frames=SPRITES)
+
+        # pipes created so far, it is never reset
+        self.count = 0
+
+        # score
+        self.high = HighScores()
+        self.best = 0
+        self.current = 0
+        self.switch = True
+
+        self.speed = INIT_SPEED
+        self.game_on = True
+        self.ticks = 0
+
+        self.scheduler = Scheduler()
+        self.scheduler.every(PIPE_TICKS, self.spawn)
+        self.scheduler.every(SCORE_TICKS, self.point)
+        self.sounds = []
+
+    def having(self, *components):
+        # the archetypes with all of these components and some entities
+        if components not in self.queries:
+            self.queries[components] = [
+                group for group in self.archetypes.values()
+                if group.has(components)]
+        return [group for group in self.queries[components] if group.count]
+
+    def obstacles(self):
+        # what jumpers can run into: colliders that are not jumpers
+        return [group for group in self.having('position', 'collider')
+                if 'jumper' not in group.components]
+
+    def mask(self, image):
+        if image not in self.masks:
+            from assets import assets
+            self.masks[image] = assets.mask(IMAGES[image])
+        return self.masks[image]
+
+    def add_pipe(self, kind, x=WIDTH, bottom=FLOOR_TOP):
+        w, h = PIPE_SIZES[kind]
+        # midbottom=(x, bottom)
+        left, top = x - w // 2, bottom - h
+        return self.archetypes['pipe'].add(x=left, last_x=left, y=top,
+                                           last_y=top, vx=-1,
+                                           image=PIPES + kind, w=w, h=h)
+
+    def spawn(self):
+        # the same random calls as simulation.World.spawn
+        if not self.game_on or not self.random.choice((1, 0)):
+            return
+        if not self.count % 2:
+            kind = self.random.choice((0, 1, 2, 3))
+        else:
+            kind = self.random.choice((0, 1, 2, 0))
+        self.add_pipe(kind)
+        self.count += 1
+
+    def point(self):
+        if not self.game_on:
+            return
+        self.current += 1
+        if self.current in STAGES:
+            self.speed += 1
+
+    def press(self):
+        for group in self.having('velocity', 'jumper'):
+            jump = ~group['jumping']
+            self.sounds.extend(['jump'] * int(np.count_nonzero(jump)))
+            group['jumping'][jump] = True
+            group['pose'][jump] = JUMP
+            group['vy'][jump] = 0.0 - HOP
+            group['bounce'][jump] = True
+        if not self.game_on:
+            self.game_on = True
+            self.switch = True
+            self.speed = INIT_SPEED
+
+    def release(self):
+        for group in self.having('velocity', 'jumper'):
+            group['vy'] += FACTOR * GRAVITY
+            group['bounce'][:] = False
+
+    def step(self):
+        self.scheduler.run(self.ticks)
+
+        # positions before this step, for drawing in between two steps
+        for group in self.having('position'):
+            group['last_x'][:] = group['x']
+            group['last_y'][:] = group['y']
+
+        if not self.game_on and self.switch:
+            self.high.add(self.current)
+            self.best = self.high.best
+            self.current = 0
+            self.switch = False
+
+        # the systems that move things stop while Mario is dead
+        for system in SYSTEMS:
+            if self.game_on or system in ALWAYS:
+                system(self)
+        self.ticks += 1
+
+""" Benchmark """
+def state(world):
+    # what has to be the same in both cores after every step
+    if isinstance(world, World):
+        mario = world.archetypes['mario']
+        pipes = world.archetypes['pipe']
+        return (world.game_on, world.speed, world.current, world.high.top(),
+                int(world.archetypes['floor']['x'][0]), int(mario['y'][0]),
+                float(mario['vy'][0]), POSES[int(mario['pose'][0])],
+                float(mario['frame'][0]),
+                list(zip((pipes['image'] - PIPES).tolist(),
+                         pipes['x'].tolist())))
+    mario = world.mario
+    return (world.game_on, world.speed, world.current, world.high.top(),
+            world.xloc, mario.rect.y, mario.amount, mario.pose, mario.frame,
+            [(kind, x) for kind, last_x, x, y in world.pipes.sprites()])
+
+def keys(steps, seed):
+    # step -> 'press' or 'release', the space bar held now and then
+    rng = random.Random(seed)
+    script = {}
+    step = rng.randrange(30, 90)
+    while step < steps:
+        script[step] = 'press'
+        step += rng.randrange(2, 40)
+        script[step] = 'release'
+        step += rng.randrange(20, 120)
+    return script
+
+def race(world, steps, script, draw, check=None):
+    # steps per second of a world, with the same presses and a draw list
+    # made after every step
+    start = time.perf_counter()
+    for tick in range(steps):
+        key = script.get(tick)
+        if key == 'press':
+            world.press()
+        elif key == 'release':
+            world.release()
+        world.step()
+        world.sounds.clear()
+        draw(world)
+        if check is not None:
+            check(tick, world)
+    return steps / (time.perf_counter() - start)
+
+def classes_draw(world):
+    # what the classes of mario.py ask of simulation.World to draw a frame
+    mario = world.mario
+    return (world.last_xloc, world.xloc, mario.pose, int(mario.frame),
+            mario.last_y, mario.rect.y, world.pipes.sprites())
+
+if __name__ == '__main__':
+    steps = option('steps', 20000)
+    seed = option('seed', 0)
+    masks = '--masks' in sys.argv
+    script = keys(steps, seed)
+
+    def classes():
+        if masks:
+            from masks import Masks
+            return simulation.World(seed, masks=Masks())
+        return simulation.World(seed)
+
+    # same seed, same presses: both cores must agree after every step
+    reference, ecs = classes(), World(seed, masks)
+
+    def check(tick, world):
+        key = script.get(tick)
+        if key == 'press':
+            reference.press()
+        elif key == 'release':
+            reference.release()
+        reference.step()
+        reference.sounds.clear()
+        if state(world) != state(reference):
+            print('the cores differ at step {}'.format(tick))
+            print(state(reference))
+            print(state(world))
+            sys.exit(1)
+
+    race(ecs, steps, script, render, check)
+    print('{} steps, same game in both cores, best scores {}'
+          .format(steps, reference.high.top()))
+
+    for name, world, draw in (('classes', classes(), classes_draw),
+                              ('ecs', World(seed, masks), render)):
+        rate = race(world, steps, script, draw)
+        print('{:<10}{:10.0f} steps per second'.format(name, rate))
@@ -0,0 +1,237 @@
+# Mario
+# Date: 18 / oct / 2026
+
+"""
+Leaderboard shared by every kiosk. The server is a single asyncio process
+holding the best scores sent by all of them; a client keeps one connection
+open and, twice per second, sends the scores queued since the last time in
+one batch and gets the global top back. The game only ever appends to the
+client's queue and reads its last copy of the top, the network lives in a
+thread of its own. Requests and replies are lines of JSON:
+
+    {"scores": [["kiosk-3", 120], ["kiosk-3", 45]], "top": 10}
+    {"top": [["kiosk-1", 310], ["kiosk-3", 120], ...]}
+
+    python leaderboard.py serve --port=8765
+    python mario.py --leaderboard=localhost:8765 --kiosk=lobby
+    python leaderboard.py bench --clients=50 --seconds=3
+"""
+
+import asyncio
+import heapq
+import json
+import random
+import socket
+import sys
+import threading
+import time
+from collections import deque
+
+from options import option
+
+HOST = 'localhost'
+PORT = 8765
+
+# entries kept by the server, and sent to the clients
+TOP = 10
+
+# seconds between two batches of a client, and the longest wait for a reply
+PERIOD = 0.5
+TIMEOUT = 5.0
+
+""" Board object """
+class Board():
+    # the best (score, kiosk) entries in a heap with the lowest on top, and
+    # the reply listing them, made again only when they change
+    def __init__(self, keep=TOP):
+        self.keep = keep
+        self.heap = []
+        self.reply = None
+
+    def add(self, kiosk, score):
+        entry = (score, kiosk)
+        if len(self.heap) < self.keep:
+            heapq.heappush(self.heap, entry)
+        elif entry > self.heap[0]:
+            heapq.heapreplace(self.heap, entry)
+        else:
+            return
+        self.reply = None
+
+    def top(self):
+        # [[kiosk, score], ...] best first, as a line ready to send
+        if self.reply is None:
+            top = [[kiosk, score] for score, kiosk in
+                   sorted(self.heap, reverse=True)]
+            self.reply = (json.dumps({'top': top}) + '\n').encode()
+        return self.reply
+
+""" Server object """
+class Server():
+    def __init__(self, keep=TOP):
+        self.board = Board(keep)
+        # scores and requests received so far
+        self.scores = 0
+        self.requests = 0
+
+    async def handle(self, reader, writer):
+        # one connection, one kiosk: a reply for every request
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = json.loads(line)
+                for kiosk, score in request.get('scores', ()):
+                    self.board.add(str(kiosk), int(score))
+                self.scores += len(request.get('scores', ()))
+                self.requests += 1
+                writer.write(self.board.top())
+                await writer.drain()
+        except (ConnectionError, ValueError, TypeError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host=HOST, port=PORT):
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def serve(self, host=HOST, port=PORT):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+""" Client object """
+class Client():
+    def __init__(self, address, kiosk=None, top=TOP, period=PERIOD,
+                 changed=None):
+        host, _, port = address.rpartition(':')
+        self.host = host or HOST
+        self.port = int(port)
+        self.kiosk = kiosk or socket.gethostname()
+        self.size = top
+        self.period = period
+
+        # scores waiting to be sent, oldest first; appending and taking from
+        # a deque is safe between threads, and the game only appends
+        self.pending = deque(maxlen=1024)
+        # last copy of the global top, replaced whole by the network thread,
+        # which calls changed() when it is not the same as before
+        self.top = []
+        self.changed = changed
+        self.connected = False
+        self.sent = 0
+        self.closing = False
+
+        self.thread = threading.Thread(target=asyncio.run, args=(self.run(),),
+                                       daemon=True)
+        self.thread.start()
+
+    @property
+    def best(self):
+        top = self.top
+        return top[0][1] if top else 0
+
+    def submit(self, score):
+        # costs the game one append, the next batch takes it
+        self.pending.append(score)
+
+    async def run(self):
+        delay = self.period
+        while not self.closing:
+            batch = []
+            writer = None
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port), TIMEOUT)
+                self.connected = True
+                delay = self.period
+                while True:
+                    while self.pending:
+                        batch.append(self.pending.popleft())
+                    request = {'scores': [[self.kiosk, score]
+                                          for score in batch],
+                               'top': self.size}
+                    writer.write((json.dumps(request) + '\n').encode())
+                    await writer.drain()
+                    line = await asyncio.wait_for(reader.readline(), TIMEOUT)
+                    if not line:
+                        raise ConnectionError('the leaderboard went away')
+                    top = [tuple(entry) for entry
+                           in json.loads(line)['top'][:self.size]]
+                    if top != self.top:
+                        self.top = top
+                        if self.changed:
+                            self.changed()
+                    self.sent += len(batch)
+                    batch = []
+                    if self.closing:
+                        writer.close()
+                        return
+                    await asyncio.sleep(self.period)
+            except (OSError, asyncio.TimeoutError, ValueError, KeyError,
+                    TypeError):
+                # the batch goes back in front and the connection is tried
+                # again, less and less often; a reply that makes no sense
+                # counts as a broken connection
+                self.connected = False
+                if writer:
+                    writer.close()
+                self.pending.extendleft(reversed(batch))
+                await asyncio.sleep(delay)
+                delay = min(2 * delay, 10.0)
+
+    def close(self):
+        # the last batch goes out if the server is there
+        self.closing = True
+        if self.connected:
+            self.thread.join(timeout=self.period + 1)
+
+""" Benchmark """
+async def flood(port, kiosk, batch, end, sent):
+    # one kiosk sending batches as fast as the server answers them
+    reader, writer = await asyncio.open_connection(HOST, port)
+    rng = random.Random(kiosk)
+    while time.perf_counter() < end:
+        scores = [rng.randrange(100000) for _ in range(batch)]
+        request = {'scores': [[kiosk, score] for score in scores], 'top': TOP}
+        writer.write((json.dumps(request) + '\n').encode())
+        await writer.drain()
+        await reader.readline()
+        sent.extend((score, kiosk) for score in scores)
+    writer.close()
+
+async def bench(clients, batch, seconds, port):
+    server = Server()
+    listener = await server.start(HOST, port)
+    port = listener.sockets[0].getsockname()[1]
+    sent = []
+    start = time.perf_counter()
+    await asyncio.gather(*(flood(port, 'kiosk-{}'.format(i), batch,
+                                 start + seconds, sent)
+                           for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    listener.close()
+    await listener.wait_closed()
+
+    # the server's top has to be the best of everything sent
+    expected = [[kiosk, score] for score, kiosk in
+                sorted(sent, reverse=True)[:TOP]]
+    top = json.loads(server.board.top())['top']
+    print('{} clients, batches of {}: {:.0f} scores per second, {:.0f} '
+          'requests per second'.format(clients, batch,
+                                       server.scores / elapsed,
+                                       server.requests / elapsed))
+    print('top is right' if top == expected else 'top is WRONG')
+    return top == expected
+
+if __name__ == '__main__':
+    if 'serve' in sys.argv[1:]:
+        asyncio.run(Server(option('keep', TOP)).serve(option('host', HOST),
+                                                      option('port', PORT)))
+    elif 'bench' in sys.argv[1:]:
+        right = asyncio.run(bench(option('clients', 50), option('batch', 20),
+                                  option('seconds', 3.0), option('port', 0)))
+        sys.exit(0 if right else 1)
+    else:
+        print(__doc__)
@@ -2,333 +2,523 @@
 # Date: 01 / jan / 1999
 # Author: Edgar A. M.
 
+"""
+The pygame front end. The rules live in simulation.py, this file turns keys
+and timer events into calls on the world and draws the world on the screen.
+"""
+
 import pygame
-import sys
 import random
-
-""" Preload pipe images """
+import sys
+import time
+import simulation
+from simulation import WIDTH, HEIGHT, FLOOR_TOP, PIPE_IMAGES, IMAGES, SOUNDS
+import bundle
+from assets import assets
+from sounds import bank
+from timing import Timings, Timeline
+from pacing import Pacer
+from scores import ScoreLog, PATH as SCORE_LOG
+from leaderboard import Client
+from replay import Tape
+from options import option
+
+def blend(last, now):
+    # position in between the last two simulation steps
+    return round(last + (now - last) * alpha)
+
+""" Pipe images, preloaded as soon as the display exists """
 pipe_images = []
-pipe_images.append(pygame.image.load("pipe_small.png"))
-pipe_images.append(pygame.image.load("pipe_twins.png"))
-pipe_images.append(pygame.image.load("pipe_big.png"))
-pipe_images.append(pygame.image.load("pipe_cluster.png"))
 
 """ Mario object """
-class Mario(pygame.sprite.Sprite):
-    def __init__(self):
-        super().__init__()
+class Mario():
+    def __init__(self, body):
+        # Mario in the simulation
+        self.body = body
+
+        # sound files, decoded by the shared bank
+        self.sounds = SOUNDS
 
-        # sounds
-        self.jump = pygame.mixer.Sound('jump.wav')
-        self.crash = pygame.mixer.Sound('crash.wav')
-        
         # while running images
         self.sprites = []
-        self.sprites.append(pygame.image.load("walk1.png"))
-        self.sprites.append(pygame.image.load("walk2.png"))
-        self.sprites.append(pygame.image.load("walk3.png"))
+        self.sprites.append(assets.image("walk1.png"))
+        self.sprites.append(assets.image("walk2.png"))
+        self.sprites.append(assets.image("walk3.png"))
 
-        # while jumping image
-        self.airborne = pygame.image.load("walk3.png")
+        # while jumping image (the same surface as the third sprite)
+        self.airborne = assets.image("walk3.png")
 
         # while dead image
-        self.dead = pygame.image.load("dead.png")
-
-        # initial frame
-        self.frame = 0
-
-        # current image
-        self.image = self.sprites[self.frame]
-
-        # current rect
-        self.rect = self.image.get_rect(topleft=(128, MARIO_TOP))
-        
-        # jumping state
-        self.jumping = False
-
-        # bounce opportunity
-        self.bounce = True
-
-        # hop increment
-        self.hop = 10
-
-        # vertical movement amount
-        self.amount = 0
-
-        # gravity
-        self.gravity = 0.60
-
-        # gravity factor
-        self.factor = 5
-
-    def run(self):
-        # keep Mario on the ground while running, gravity is trying
-        # to pull him down!
-        self.rect.top = MARIO_TOP
-        
-        # increase frame rate slowly:
-        self.frame += DAMPENING
-
-        # if you run out of sprites, choose the first one again
-        if self.frame >= len(self.sprites):
-            self.frame = int(0)
-            self.image = self.sprites[self.frame]
+        self.dead = assets.image("dead.png")
+
+    def play(self, sounds):
+        for name in sounds:
+            bank.play(self.sounds[name])
+        sounds.clear()
+
+    def blits(self):
+        if self.body.pose == 'dead':
+            image = self.dead
+        elif self.body.pose == 'airborne':
+            image = self.airborne
         else:
-            self.image = self.sprites[ int(self.frame) ]
-
-    def swoosh(self):
-        # pull Mario down by moving the rectangle downwards
-        self.amount += self.gravity
-        self.rect.top += self.amount
-
-    def check_collision(self, _pipes):
-        global GAME_ON
-        
-        for _pipe in _pipes:
-            if self.rect.colliderect(_pipe.rect):
-                self.crash.play()
-                GAME_ON = False
-                self.jumping = False
-                self.image = self.dead
-                
-    def update(self, _pipes):
-        self.check_collision(_pipes)
-
-        if GAME_ON:
-            # pull Mario down
-            self.swoosh()
-        
-            if self.jumping:
-                # if jumping and going down:
-                if self.amount > 0:
-                    # has Mario's head reached its original position?
-                    if self.rect.top >= MARIO_TOP:
-                        # if it hits the ground and bounce=True
-                        # (it will jump again right after this)
-                        if self.bounce:
-                            # jump sounds
-                            self.jump.play()
-                            # jumping state is set to True
-                            self.jumping = True
-                            # change the image
-                            self.image = self.airborne
-                            # stop vertical amount of movement
-                            self.amount = 0
-                            # jump again!
-                            self.amount -= self.hop
-                        # if it hits the ground and bounce=False
-                        # (it will run right after this)
-                        else:
-                            self.jumping = False
-                            self.amount = 0
-                            self.rect.top = MARIO_TOP
-                            self.frame = int(0)
-                            self.image = self.sprites[self.frame]
-            else:
-                self.run()
+            image = self.sprites[int(self.body.frame)]
+        y = blend(self.body.last_y, self.body.rect.y)
+        return [(image, (self.body.rect.x, y))]
 
 """ Floor object """
 class Floor():
     def __init__(self):
-        self.image = pygame.image.load("floor.png")
-        self.xloc = 0
-
-    def move(self):
-        # move to the left, add a small amount each time
-        self.xloc -= SPEED
-        # if the floor disappears, reset to original position
-        if self.xloc <= -WIDTH:
-            self.xloc = 0
-
-    def draw(self):
-        # first floor
-        screen.blit(self.image, (self.xloc, FLOOR_TOP))
-        # second floor that will replace the missing first floor
-        screen.blit(self.image, (self.xloc + WIDTH, FLOOR_TOP))
+        # the floor keeps its alpha, it is blended only once, right below
+        self.image = assets.image("floor.png")
+
+        # both floors side by side on top of the background they cover,
+        # pre-composited once into an opaque strip, so that a single blit
+        # of a screen-wide window draws the scrolling floor
+        width, height = self.image.get_size()
+        under = pygame.Rect(0, FLOOR_TOP, width, height)
+        self.strip = pygame.Surface((2 * width, height)).convert()
+        for xloc in (0, width):
+            self.strip.blit(background.image, (xloc, 0), under)
+            self.strip.blit(self.image, (xloc, 0))
 
     def update(self):
-        if GAME_ON:
-            self.move()
-        self.draw()
+        # if the floor was reset on the last step, it is still moving left
+        xloc = world.xloc
+        if xloc > world.last_xloc:
+            xloc -= WIDTH
+        xloc = blend(world.last_xloc, xloc)
+        if xloc <= -WIDTH:
+            xloc += WIDTH
+
+        # the window starts where the first floor has been moved to, the
+        # second floor replaces the missing first floor within the strip;
+        # xloc never leaves (-WIDTH, 0], whatever the speed is
+        window = pygame.Rect(-xloc, 0, WIDTH, self.image.get_height())
+        # the whole floor strip changes whenever the floor is drawn
+        return screen.blit(self.strip, (0, FLOOR_TOP), window)
 
 """ Background object """
 class Background():
     def __init__(self):
-        self.image = pygame.image.load("background.png")
+        self.image = assets.image("background.png", alpha=False)
+
+        # only the sky is drawn, the floor covers the rest of the screen
+        self.sky = pygame.Rect(0, 0, WIDTH, FLOOR_TOP)
 
     def update(self):
         # (0, 0) is the upper left corner of the rectangle enclosing the image
-        screen.blit(self.image, (0, 0))
+        screen.blit(self.image, (0, 0), self.sky)
+
+""" Pipes object """
+class Pipes():
+    def blits(self):
+        return [(pipe_images[kind], (blend(last_x, x), y))
+                for kind, last_x, x, y in world.pipes.sprites()]
+
+""" Score texts """
+class Texts():
+    # a label and a zero padded value rendered by the font, kept for the
+    # last keep values: the current score starts again from 0 every game
+    # and the best ones seldom change, so most values are rendered once
+    def __init__(self, font, color, label='', digits=5, keep=128):
+        self.font = font
+        self.color = color
+        self.label = label
+        self.digits = digits
+        self.keep = keep
+        self.cache = {}
+
+    def render(self, value):
+        text = self.cache.get(value)
+        if text is None:
+            if len(self.cache) >= self.keep:
+                # the value rendered first goes first
+                del self.cache[next(iter(self.cache))]
+            text = self.font.render(self.label + str(value).zfill(self.digits),
+                                    True, self.color)
+            self.cache[value] = text
+        return text
 
-""" Pipe object """
-class Pipe(pygame.sprite.Sprite):
-
-    # object count
-    count = 0
-    
+""" Score """
+class Score():
     def __init__(self):
-        super().__init__()
-
-        # even objects created choose from the four different pipes
-        if not Pipe.count % 2:
-            self.image = pipe_images[ random.choice((0, 1, 2, 3)) ]
-        # odd objects created choose from all pipes but the big cluster
-        else:
-            self.image = pipe_images[ random.choice((0, 1, 2, 0)) ]
-        self.rect = self.image.get_rect(midbottom=(WIDTH, FLOOR_TOP))
+        self.font = pygame.font.SysFont('FiraCode', 32)
 
-        # increase count of objects created as soon as a pipe is created
-        Pipe.count += 1
+        # rendered texts for the highest and the current score, and the
+        # best of every kiosk when there is a leaderboard
+        color = (255, 255, 255)
+        self.cached = [Texts(self.font, color, 'HI '), Texts(self.font, color)]
+        self.rects = [pygame.Rect(700, 24, 0, 0), pygame.Rect(900, 24, 0, 0)]
+        if leaderboard:
+            self.cached.append(Texts(self.font, color, 'TOP '))
+            self.rects.append(pygame.Rect(480, 24, 0, 0))
 
-    def destroy(self):
-        # pipe sprite disappears as soon as it is entirely out of the screen
-        if self.rect.right <= 0:
-            self.kill()
+        # values drawn last time and their texts
+        self.shown = (None,) * len(self.cached)
+        self.texts = [None] * len(self.cached)
 
     def update(self):
-        if GAME_ON:
-            self.rect.x -= SPEED
-        # this destroys all pipe sprites after Mario dies, otherwise
-        # you will crash against the same pipe as soon as you resume
-        # the game
+        if leaderboard:
+            values = (high_scores.best, world.current, leaderboard.best)
         else:
-            self.kill()
-        self.destroy()
+            values = (high_scores.best, world.current)
+
+        # texts are only looked up again when their values change
+        for index, value in enumerate(values):
+            if self.shown[index] != value:
+                self.texts[index] = self.cached[index].render(value)
+
+        # the dirty painter keeps the unchanged texts on the screen, unless
+        # something drawn over them (stress pipes in the top lanes) has just
+        # been cleared away with the background
+        if DIRTY and self.shown == values and not self.covered():
+            return []
+        self.shown = values
+
+        # highest score, current score and the leaderboard's best
+        rects = []
+        for index, text in enumerate(self.texts):
+            rect = text.get_rect(topleft=self.rects[index].topleft)
+            # old text is wiped first, the new text could be narrower
+            if DIRTY:
+                wipe = rect.union(self.rects[index])
+                screen.blit(background.image, wipe, wipe)
+                rects.append(wipe)
+            screen.blit(text, rect)
+            self.rects[index] = rect
+
+        # regions covered by the texts
+        return rects
+
+    def covered(self):
+        return any(rect.collidelist(painter.previous) != -1
+                   for rect in self.rects)
+
+""" Dirty rectangles painter """
+class Painter():
+    def __init__(self):
+        # regions drawn on the previous frame
+        self.previous = []
+        # regions drawn on the current frame
+        self.current = []
+        # regions updated on the display but restored by their owner
+        self.pushed = []
+        # the very first frame is pushed to the display entirely
+        self.first = True
+
+    def clear(self):
+        # paint the background back only where something was drawn before
+        for rect in self.previous:
+            screen.blit(background.image, rect, rect)
+
+    def add(self, rects):
+        self.current.extend(rects)
+
+    def push(self, rects):
+        self.pushed.extend(rects)
+
+    def draw(self, blits):
+        self.current.extend(screen.blits(blits))
+
+    def flip(self):
+        if self.first:
+            pygame.display.flip()
+            self.first = False
+        # old regions must be pushed too, so that moved sprites leave no trail
+        else:
+            pygame.display.update(self.previous + self.current + self.pushed)
+        self.previous = self.current
+        self.current = []
+        self.pushed = []
 
-""" Score """
-class Score():
+""" Timings overlay """
+class Overlay():
     def __init__(self):
-        self.high = [0]
-        self.current = 0
-        self.font = pygame.font.SysFont('FiraCode', 32)
-        self.switch = True
+        self.font = pygame.font.SysFont('FiraCode', 14)
+        self.shown = False
+        self.image = None
 
-    def increase(self):
-        self.current += 1
+    def toggle(self):
+        # the overlay needs timings, they start being taken right away
+        self.shown = not self.shown
+        timings.enabled = timings.enabled or self.shown
+        self.image = None
 
     def update(self):
-        color = (255, 255, 255)
-
-        # this statement is only executed once right after game over,
-        # the switch makes sure that this happens only once, that is,
-        # the last score is appended to the highest scores list.
-        if GAME_ON == False and self.switch == True:
-            self.high.append(self.current)
-            self.current = 0
-            self.switch = False
-            
-        # highest score
-        text = 'HI ' + str(max(self.high)).zfill(5)
-        pos = (700, 24)     
-        screen.blit(self.font.render(text, True, color), pos)
-
-        # current score
-        text = str(self.current).zfill(5)
-        pos = (900, 24)     
-        screen.blit(self.font.render(text, True, color), pos)
+        if not self.shown:
+            return []
+
+        # the stats are worked out and rendered again twice per second
+        if self.image is None or timings.frames % (FPS // 2 or 1) == 0:
+            lines = [self.font.render(line, True, (255, 255, 255))
+                     for line in timings.lines()]
+            height = self.font.get_linesize()
+            width = max(line.get_width() for line in lines)
+            self.image = pygame.Surface((width + 8, height * len(lines) + 8))
+            for index, line in enumerate(lines):
+                self.image.blit(line, (4, 4 + index * height))
+        return [screen.blit(self.image, (8, 8))]
+
+def still():
+    # nothing on screen changes until a key is pressed: paused, or dead with
+    # the score kept and the pipes gone. A replay, or the autoplayer, has to
+    # go on stepping
+    if not IDLE or REPLAY or autoplayer:
+        return False
+    return paused or (not world.game_on and not world.switch
+                      and not len(world.pipes))
+
+def top_changed():
+    # called by the leaderboard's thread: the event ends an idle wait, so
+    # the new TOP is drawn even on the game over screen
+    if pygame.display.get_init():
+        pygame.event.post(pygame.event.Event(TOP_CHANGED))
+
+def leave():
+    high_scores.close()
+    if leaderboard:
+        leaderboard.close()
+    timings.dump(TIMINGS)
+    if JITTER:
+        print(pacer.report())
+    if autoplayer:
+        print(autoplayer.report())
+    if RECORD:
+        tape.save(RECORD, world)
+    pygame.quit()
+    sys.exit()
+
+""" Startup """
+# images are decoded by a pool of threads while SDL and the display start,
+# sounds as soon as the mixer is ready. A built asset bundle (python
+# bundle.py) is mapped instead, and then there is nothing left to decode
+timeline = Timeline()
+if '--no-bundle' not in sys.argv:
+    assets_bundle = bundle.load()
+    if assets_bundle:
+        assets.use(assets_bundle)
+        bank.use(assets_bundle)
+        timeline.mark('bundle mapped')
+assets.preload(IMAGES)
+timeline.mark('decoding started')
 
 """ Settings """
 pygame.mixer.pre_init(44100, -16, 2, 512)       # sounds settings
 pygame.init()                                   # init module
+bank.preload(SOUNDS.values())
+timeline.mark('pygame.init')
 pygame.mouse.set_visible(False)                 # no mouse cursor
-clock = pygame.time.Clock()                     # create clock
-SPAWNPIPE = pygame.USEREVENT                    # pipe event
-PIPE_FREQ = 700                                 # 700 is 0.7 seconds
-pygame.time.set_timer(SPAWNPIPE, PIPE_FREQ)     # timer for pipe event
-SPAWNPOINT = pygame.USEREVENT + 1               # score event
-SCORE_FREQ = 100                                # 100 is 0.1 seconds
-pygame.time.set_timer(SPAWNPOINT, SCORE_FREQ)   # timer for score event
 
 """ Game variables """
-WIDTH, HEIGHT = 1024, 512           # screen dimensions
-INIT_SPEED = 9                      # initial stage speed
-SPEED = INIT_SPEED                  # later stages speed
-FLOOR_TOP = HEIGHT - 64             # vertical position of the floor top
-MARIO_TOP = FLOOR_TOP - 32          # vertical position of Mario's head
-DAMPENING = 0.25                    # sprite refreshment dampening factor
-GAME_ON = True                      # game over status
+DIRTY = '--dirty' in sys.argv       # repaint only the regions that changed
+ASSETS = '--assets' in sys.argv     # print asset loading times
+NUMPY = '--numpy' in sys.argv       # keep the pipes in NumPy arrays
+BOXES = '--boxes' in sys.argv       # collide rectangles, not pixels
+SIM_RATE = option('sim-rate', simulation.RATE)  # steps per second
+FPS = option('fps', 120)            # frames drawn per second
+STEP = 1 / SIM_RATE                 # seconds simulated by each step
+MAX_STEPS = 10                      # steps caught up at most per frame
+TIMINGS = option('timings', '')     # file for the stage timings summary
+RECORD = option('record', '')       # file to record the space bar into
+REPLAY = option('replay', '')       # file to play the space bar back from
+STARTUP = '--startup' in sys.argv   # print the startup timeline
+STRESS = option('stress', 0)        # pipes kept in flight by stress.py
+LANES = option('lanes', 6)          # extra lanes the stress pipes run in
+PACING = option('pacing', 'sleep')  # sleep, busy, precise or vsync
+IDLE = '--no-idle' not in sys.argv  # wait for events when nothing moves
+JITTER = '--jitter' in sys.argv     # print the frame pacing report
+SCORES = option('scores', SCORE_LOG)  # high score log, empty for none
+LEADERBOARD = option('leaderboard', '')  # host:port of leaderboard.py
+KIOSK = option('kiosk', '')         # name of this kiosk on the leaderboard
+TOP_CHANGED = pygame.USEREVENT      # the leaderboard's top has changed
+AUTOPLAY = '--autoplay' in sys.argv  # the game plays itself (attract mode)
+BUDGET = option('budget', 2.0)      # ms of autoplay lookahead per frame
 
 """ Objects """
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
+pacer = Pacer(PACING, FPS)
+screen = pacer.display((WIDTH, HEIGHT))
+timeline.mark('set_mode')
+
+# images are converted to the display format, so this goes after set_mode
+for name in PIPE_IMAGES:
+    pipe_images.append(assets.image(name))
+
+# the tape holds the seed and the space bar presses, played back or recorded
+if REPLAY:
+    tape = Tape.load(REPLAY)
+else:
+    tape = Tape(option('seed', random.randrange(2 ** 32)), masks=not BOXES,
+                stress=[STRESS, LANES] if STRESS else None)
+if NUMPY:
+    from obstacles import PipeArrays
+    world = tape.world(PipeArrays())
+else:
+    world = tape.world()
+# the best scores ever, a replay keeps its own
+high_scores = ScoreLog(SCORES if not REPLAY else '')
+games = world.high.games
+# the scores of this kiosk go to the leaderboard too, not those of a replay
+leaderboard = None
+if LEADERBOARD and not REPLAY:
+    leaderboard = Client(LEADERBOARD, KIOSK, changed=top_changed)
+# the autoplayer presses the space bar through the tape, so it can be recorded
+autoplayer = None
+if AUTOPLAY and not REPLAY:
+    from autoplay import Autoplayer
+    autoplayer = Autoplayer(world, BUDGET / 1000)
+    autoplay_keys = (lambda: tape.press(world), lambda: tape.release(world))
 background = Background()
 floor = Floor()
 score = Score()
-pipes = pygame.sprite.Group()
-mario = pygame.sprite.GroupSingle(Mario())
+pipes = Pipes()
+mario = Mario(world.mario)
+painter = Painter()
+timings = Timings(enabled=bool(TIMINGS))
+overlay = Overlay()
+timeline.mark('objects')
+
+if ASSETS:
+    print(assets.report())
+    print(bank.report())
+
+# the dirty painter restores regions from the background drawn just once
+if DIRTY:
+    background.update()
+
+# simulated time still owed to the world, and where in between the last two
+# steps the frame is drawn (0 is the last step, 1 is the next one)
+lag = 0.0
+alpha = 1.0
+previous = time.perf_counter()
+
+# P stops the world, and then the loop only waits for keys
+paused = False
+# world snapshot and tape length kept by F5
+checkpoint = None
 
 """ Main Loop """
 while True:
+    timings.start()
 
     # Event handler
-    for event in pygame.event.get():
-        
+    for event in pacer.events(still()):
+
         if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
-            
-        if event.type == SPAWNPIPE and GAME_ON:
-            # 50% probability of pipe creation
-            if random.choice((1, 0)):
-                pipes.add(Pipe())
-                
-        if event.type == SPAWNPOINT and GAME_ON:
-            # Increase score
-            score.increase()
-            # Increase difficulty every certain points (values are subjective),
-            # the more "if" statements, the more stages of difficulty levels.
-            if score.current == 100:
-                SPEED += 1
-            if score.current == 500:
-                SPEED += 1
-            if score.current == 1000:
-                SPEED += 1
-            
+            leave()
+
         if event.type == pygame.KEYDOWN:
 
             # escape key to kill the game and the window
             if event.key == pygame.K_ESCAPE:
-                pygame.quit()
-                sys.exit()
-
-            # Mario is running, you've just pressed the space bar!
-            if event.key == pygame.K_SPACE and mario.sprite.jumping == False:
-                # 1: jump sound
-                # 2: jumping state is true
-                # 3: bounce option is true
-                # 4: change image
-                # 5: set vertical amount of movement to zero
-                # 6: move Mario upwards
-                mario.sprite.jump.play()                    # 1
-                mario.sprite.jumping = True                 # 2
-                mario.sprite.bounce = True                  # 3
-                mario.sprite.image = mario.sprite.airborne  # 4
-                mario.sprite.amount = 0                     # 5
-                mario.sprite.amount -= mario.sprite.hop     # 6
-
-            # You died! You want to play again and press the space bar!
-            if event.key == pygame.K_SPACE and not GAME_ON:
-                # 1: Game on again to move floor and pipes
-                # 2: score appender switch
-                # 3: reset speed to the original speed value
-                GAME_ON = True                              # 1
-                score.switch = True                         # 2
-                SPEED = INIT_SPEED                          # 3
-
-        # You've just jumped and then you release the space bar    
-        if event.type == pygame.KEYUP:
-            # gravity is magnified in order to bring Mario down faster
-            mario.sprite.amount += mario.sprite.factor * mario.sprite.gravity
-            # deactivate the bounce option
-            mario.sprite.bounce = False                                       
+                leave()
+
+            # jump, or play again after you died
+            if (event.key == pygame.K_SPACE and not REPLAY and not paused
+                    and not autoplayer):
+                tape.press(world)
+
+            # F3 shows or hides the stage timings
+            if event.key == pygame.K_F3:
+                overlay.toggle()
+
+            # P pauses or resumes the game
+            if event.key == pygame.K_p:
+                paused = not paused
+
+            # F5 keeps a checkpoint, F9 goes back to it; a recording forgets
+            # the keys pressed after the checkpoint
+            if event.key == pygame.K_F5 and not REPLAY:
+                checkpoint = (world.snapshot(), len(tape.inputs))
+            if event.key == pygame.K_F9 and checkpoint:
+                world.restore(checkpoint[0])
+                del tape.inputs[checkpoint[1]:]
+                games = world.high.games
+
+        # You've just jumped and then you release the space bar
+        if event.type == pygame.KEYUP and event.key not in (
+                pygame.K_F3, pygame.K_p, pygame.K_F5, pygame.K_F9):
+            if not REPLAY and not paused and not autoplayer:
+                tape.release(world)
+    # an idle wait is not part of the frame
+    if pacer.idled:
+        timings.start()
+    timings.mark('events')
+
+    # Rules, always in steps of the same length whatever the frame rate
+    now = time.perf_counter()
+    # time spent paused or waiting idle is not owed to the world
+    if not paused and not pacer.idled:
+        lag += now - previous
+    previous = now
+    steps = 0
+    # the steps of this frame share the autoplayer's budget
+    if autoplayer:
+        deadline = now + BUDGET / 1000
+    while lag >= STEP and steps < MAX_STEPS:
+        if REPLAY:
+            tape.play(world)
+            # the recording is over
+            if world.ticks >= tape.ticks:
+                leave()
+        elif autoplayer:
+            autoplayer.play(*autoplay_keys, deadline)
+        world.step()
+        lag -= STEP
+        steps += 1
+    # a very long frame is not caught up entirely, the game slows down
+    # instead of spiralling into ever longer frames
+    lag = min(lag, STEP)
+    alpha = lag / STEP
+    mario.play(world.sounds)
+    # a game has just ended, its score goes to the table; attract mode
+    # games are not anybody's
+    if world.high.games != games:
+        games = world.high.games
+        if not autoplayer:
+            high_scores.add(world.high.last)
+        if leaderboard and not autoplayer:
+            leaderboard.submit(world.high.last)
+    timings.mark('rules')
 
     # Drawing
-    background.update()
-    floor.update()
-    score.update()
-    pipes.draw(screen)
-    pipes.update()
-    mario.draw(screen)
-    mario.update(pipes)
-    pygame.display.flip()
-    clock.tick(120)
-    
+    if DIRTY:
+        painter.clear()
+        timings.mark('background')
+        painter.add([floor.update()])
+        timings.mark('floor')
+        painter.push(score.update())
+        timings.mark('score')
+        painter.draw(pipes.blits())
+        timings.mark('pipes')
+        painter.draw(mario.blits())
+        timings.mark('mario')
+        painter.add(overlay.update())
+        timings.mark('overlay')
+        painter.flip()
+    else:
+        background.update()
+        timings.mark('background')
+        floor.update()
+        timings.mark('floor')
+        score.update()
+        timings.mark('score')
+        screen.blits(pipes.blits())
+        timings.mark('pipes')
+        screen.blits(mario.blits())
+        timings.mark('mario')
+        overlay.update()
+        timings.mark('overlay')
+        pygame.display.flip()
+    timings.mark('display')
+
+    # the startup timeline ends with the first frame on the display
+    if timeline:
+        timeline.mark('first frame')
+        if STARTUP:
+            print(timeline.report())
+        timeline = None
+
+    pacer.wait()
+    timings.mark('tick')
+    timings.end()
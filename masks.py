@@ -0,0 +1,38 @@
+# Mario
+# Date: 18 / oct / 2026
+
+"""
+Pixel-accurate collision. A mask is built once for every running sprite and
+every pipe image; the world only asks for the mask test once the rects of
+Mario and a pipe overlap, so the cost per frame stays that of the rects.
+"""
+
+from assets import assets
+from simulation import PIPE_IMAGES
+
+# running sprites, the airborne and the dead images of mario.py
+SPRITE_IMAGES = ("walk1.png", "walk2.png", "walk3.png")
+AIRBORNE_IMAGE = "walk3.png"
+DEAD_IMAGE = "dead.png"
+
+""" Masks object """
+class Masks():
+    def __init__(self):
+        self.sprites = [assets.mask(name) for name in SPRITE_IMAGES]
+        self.airborne = assets.mask(AIRBORNE_IMAGE)
+        self.dead = assets.mask(DEAD_IMAGE)
+        self.pipes = [assets.mask(name) for name in PIPE_IMAGES]
+
+    def exact(self, mario):
+        # the test for the image Mario is showing right now
+        if mario.pose == 'dead':
+            mask = self.dead
+        elif mario.pose == 'airborne':
+            mask = self.airborne
+        else:
+            mask = self.sprites[int(mario.frame)]
+        mx, my = mario.rect.x, mario.rect.y
+
+        def overlap(kind, x, y):
+            return mask.overlap(self.pipes[kind], (x - mx, y - my)) is not None
+        return overlap
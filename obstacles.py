@@ -0,0 +1,104 @@
+# Mario
+# Date: 18 / oct / 2026
+
+"""
+Pipes kept in NumPy arrays instead of one Python object each. Every step
+moves and culls all of them with a handful of array operations, and Mario is
+tested against all of them at once. It is a drop-in replacement for
+simulation.Pipes: simulation.World(pipes=PipeArrays()).
+"""
+
+import numpy as np
+
+from simulation import WIDTH, FLOOR_TOP, PIPE_SIZES
+
+# width and height of every kind of pipe
+WIDTHS = np.array([w for w, h in PIPE_SIZES], dtype=np.int32)
+HEIGHTS = np.array([h for w, h in PIPE_SIZES], dtype=np.int32)
+
+""" Pipe arrays object """
+class PipeArrays():
+    def __init__(self, capacity=64):
+        # pipes in flight, they are always the first count items
+        self.count = 0
+        self.kind = np.zeros(capacity, dtype=np.int32)
+        self.x = np.zeros(capacity, dtype=np.int32)
+        self.last_x = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.w = np.zeros(capacity, dtype=np.int32)
+        self.h = np.zeros(capacity, dtype=np.int32)
+
+    def __len__(self):
+        return self.count
+
+    def arrays(self):
+        return (self.kind, self.x, self.last_x, self.y, self.w, self.h)
+
+    def grow(self):
+        # twice the room, the pipes in flight are copied over
+        for name in ('kind', 'x', 'last_x', 'y', 'w', 'h'):
+            old = getattr(self, name)
+            new = np.zeros(2 * len(old), dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, kind, x=WIDTH, bottom=FLOOR_TOP):
+        if self.count == len(self.x):
+            self.grow()
+        i = self.count
+        w, h = WIDTHS[kind], HEIGHTS[kind]
+        # midbottom=(x, bottom)
+        self.kind[i] = kind
+        self.x[i] = self.last_x[i] = x - w // 2
+        self.y[i] = bottom - h
+        self.w[i] = w
+        self.h[i] = h
+        self.count += 1
+
+    def remember(self):
+        n = self.count
+        self.last_x[:n] = self.x[:n]
+
+    def move(self, speed):
+        n = self.count
+        self.x[:n] -= speed
+
+        # pipes disappear as soon as they are entirely out of the screen
+        keep = self.x[:n] + self.w[:n] > 0
+        kept = int(np.count_nonzero(keep))
+        if kept < n:
+            for array in self.arrays():
+                array[:kept] = array[:n][keep]
+            self.count = kept
+
+    def clear(self):
+        self.count = 0
+
+    def hits(self, rect, exact=None):
+        # number of pipes overlapping rect, the same test as Box.colliderect;
+        # exact(kind, x, y) has the last word on the pipes whose rects overlap
+        n = self.count
+        x, y, w, h = self.x[:n], self.y[:n], self.w[:n], self.h[:n]
+        overlap = ((rect.x < x + w) & (x < rect.x + rect.w) &
+                   (rect.y < y + h) & (y < rect.y + rect.h))
+        if exact is None:
+            return int(np.count_nonzero(overlap))
+        return sum(1 for i in np.flatnonzero(overlap).tolist()
+                   if exact(int(self.kind[i]), int(x[i]), int(y[i])))
+
+    def sprites(self):
+        # (kind, last x, x, y) of every pipe, for drawing
+        n = self.count
+        return list(zip(self.kind[:n].tolist(), self.last_x[:n].tolist(),
+                        self.x[:n].tolist(), self.y[:n].tolist()))
+
+    def state(self):
+        # the pipes as plain numbers, the same for every store
+        return tuple(self.sprites())
+
+    def restore(self, state):
+        self.count = 0
+        for kind, last_x, x, y in state:
+            self.add(kind)
+            i = self.count - 1
+            self.last_x[i], self.x[i], self.y[i] = last_x, x, y
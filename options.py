@@ -0,0 +1,15 @@
+# Mario
+# Date: 18 / oct / 2026
+
+"""
+Command line options of the headless tools, written --name=value.
+"""
+
+import sys
+
+def option(name, default):
+    # --name=value on the command line, of the same type as the default
+    for arg in sys.argv[1:]:
+        if arg.startswith('--' + name + '='):
+            return type(default)(arg.split('=', 1)[1])
+    return default
@@ -0,0 +1,175 @@
+# Mario
+# Date: 18 / oct / 2026
+
+"""
+Frame pacing. The end of every frame is held until the next one is due, in
+one of four ways:
+
+    sleep     pygame's Clock.tick, a coarse sleep (the game's default)
+    busy      Clock.tick_busy_loop, spins on the CPU the whole time
+    precise   sleeps until shortly before the deadline and spins the rest;
+              deadlines follow each other, so the rate does not drift
+    vsync     presentation locked to the display's refresh, the target
+              rate is the refresh rate
+
+When nothing on screen can change, the loop blocks on pygame.event.wait
+instead of drawing the same frame again. The time between frames is kept,
+and its spread around the target period is the jitter report. Compare the
+modes on a given machine with:
+
+    python pacing.py --fps=120 --seconds=3
+"""
+
+import sys
+import time
+from collections import deque
+
+import pygame
+
+from options import option
+
+MODES = ('sleep', 'busy', 'precise', 'vsync')
+
+# seconds before a deadline the precise mode stops sleeping and spins
+SPIN = 0.002
+
+""" Pacer object """
+class Pacer():
+    def __init__(self, mode='sleep', rate=120, window=1024):
+        if mode not in MODES:
+            raise ValueError('pacing is one of {}'.format(', '.join(MODES)))
+        self.mode = mode
+        # frames per second, 0 draws them as fast as possible
+        self.rate = rate
+        self.period = 1 / rate if rate else 0
+        self.clock = pygame.time.Clock()
+        # when the next frame is due, in the precise mode
+        self.deadline = None
+
+        # seconds between the last frames, and when the last one ended
+        self.intervals = deque(maxlen=window)
+        self.last = None
+        # frames that took over one and a half periods, and idle waits
+        self.missed = 0
+        self.waits = 0
+        # whether the last events came after an idle wait
+        self.idled = False
+
+    def display(self, size):
+        # the screen; in vsync mode the flip waits for the vertical blank,
+        # where the driver cannot do that the precise mode takes over
+        if self.mode == 'vsync':
+            try:
+                return pygame.display.set_mode(size, pygame.SCALED, vsync=1)
+            except pygame.error:
+                print('vsync is not available, pacing falls back to precise',
+                      file=sys.stderr)
+                self.mode = 'precise'
+        return pygame.display.set_mode(size)
+
+    def events(self, static=False):
+        # the pending events; when static, nothing would change on screen,
+        # so this blocks until the next one comes
+        if not static:
+            self.idled = False
+            return pygame.event.get()
+        events = [pygame.event.wait()]
+        events.extend(pygame.event.get())
+        self.idled = True
+        self.waits += 1
+        # the wait is not a frame, the next interval starts afresh
+        self.last = None
+        self.deadline = None
+        return events
+
+    def wait(self):
+        # end of a frame, held until the next one is due
+        if self.mode == 'sleep':
+            self.clock.tick(self.rate)
+        elif self.mode == 'busy':
+            self.clock.tick_busy_loop(self.rate)
+        elif self.mode == 'precise':
+            self.sleep()
+            # the clock only measures here, the wait is over
+            self.clock.tick()
+        else:
+            # the flip already waited for the display
+            self.clock.tick()
+        self.record()
+
+    def sleep(self):
+        now = time.perf_counter()
+        if self.deadline is None:
+            self.deadline = now
+        self.deadline += self.period
+        # a frame later than a whole period starts the schedule over, rather
+        # than rushing the following ones to catch up
+        if self.deadline < now - self.period:
+            self.deadline = now
+        self.until(self.deadline)
+
+    def until(self, deadline):
+        # sleeps until shortly before the deadline and spins the rest; a
+        # harness with a simulated clock (bench.py) advances it here instead
+        remaining = deadline - time.perf_counter()
+        if remaining > SPIN:
+            time.sleep(remaining - SPIN)
+        while time.perf_counter() < deadline:
+            pass
+
+    def record(self):
+        now = time.perf_counter()
+        if self.last is not None:
+            interval = now - self.last
+            self.intervals.append(interval)
+            if self.period and interval > 1.5 * self.period:
+                self.missed += 1
+        self.last = now
+
+    def stats(self):
+        # frame rate, mean interval, jitter (standard deviation) and the
+        # p50, p95, p99 and max distance to the target period, in ms
+        count = len(self.intervals)
+        if not count:
+            return None
+        mean = sum(self.intervals) / count
+        spread = (sum((i - mean) ** 2 for i in self.intervals) / count) ** 0.5
+        target = self.period or mean
+        ordered = sorted(abs(i - target) for i in self.intervals)
+        last = count - 1
+        stats = {'fps': 1 / mean if mean else 0, 'mean': mean * 1000,
+                 'jitter': spread * 1000, 'missed': self.missed,
+                 'waits': self.waits}
+        for name, p in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99),
+                        ('max', 1.0)):
+            stats[name] = ordered[int(last * p)] * 1000
+        return stats
+
+    def report(self):
+        stats = self.stats()
+        if stats is None:
+            return '{:<8} no frames'.format(self.mode)
+        return ('{:<8}{fps:8.1f} fps  mean {mean:6.2f} ms  jitter '
+                '{jitter:6.3f} ms  off p50 {p50:6.3f}  p95 {p95:6.3f}  '
+                'p99 {p99:6.3f}  max {max:6.3f}  missed {missed}  '
+                'idle waits {waits}'
+                .format(self.mode, **stats))
+
+if __name__ == '__main__':
+    rate = option('fps', 120)
+    seconds = option('seconds', 3.0)
+    modes = option('modes', ','.join(MODES)).split(',')
+
+    pygame.display.init()
+    for mode in modes:
+        # a light frame: clear the screen and show it
+        pacer = Pacer(mode, rate)
+        screen = pacer.display((640, 360))
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            pygame.event.pump()
+            screen.fill((0, 0, 0))
+            pygame.display.flip()
+            pacer.wait()
+        print(pacer.report())
+    pygame.quit()
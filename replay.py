@@ -0,0 +1,141 @@
+# Mario
+# Date: 18 / oct / 2026
+
+"""
+Input recording and replay. A tape holds the seed of the world and every
+press and release of the space bar with the simulation step it was applied
+on; since pipes and points also come on simulation steps, playing the tape
+back gives exactly the same game. Record with mario.py --record=run.json,
+watch it again with mario.py --replay=run.json, or replay it headless as fast
+as possible (and check that it still ends the same way) with:
+
+    python replay.py run.json
+    python replay.py run.json --rewind=500
+
+--rewind plays every 500 steps ahead and goes back with World.restore
+before going on, so the result only matches if restoring is exact.
+"""
+
+import json
+import sys
+import time
+
+import simulation
+
+""" Tape object """
+class Tape():
+    def __init__(self, seed, masks=True, inputs=None, ticks=0, result=None,
+                 stress=None):
+        self.seed = seed
+        # pixel collision changes the game, so the tape says which was used
+        self.masks = masks
+        # [pipes, lanes] of mario.py --stress, whose pipes are in the result
+        self.stress = stress
+        # [step, 'press' or 'release'] in the order they were applied
+        self.inputs = inputs if inputs is not None else []
+        # steps the recorded game lasted, and how it ended
+        self.ticks = ticks
+        self.result = result
+        # next input to play back
+        self.next = 0
+
+    def press(self, world):
+        self.inputs.append([world.ticks, 'press'])
+        world.press()
+
+    def release(self, world):
+        self.inputs.append([world.ticks, 'release'])
+        world.release()
+
+    def play(self, world):
+        # apply the inputs recorded for the step the world is about to run
+        inputs = self.inputs
+        while self.next < len(inputs) and inputs[self.next][0] <= world.ticks:
+            if inputs[self.next][1] == 'press':
+                world.press()
+            else:
+                world.release()
+            self.next += 1
+
+    def world(self, pipes=None):
+        # a world that plays this tape
+        masks = None
+        if self.masks:
+            from masks import Masks
+            masks = Masks()
+        world = simulation.World(self.seed, pipes=pipes, masks=masks)
+        if self.stress:
+            # the game's own pipes still come, the others fly over Mario
+            from stress import Stress
+            count, lanes = self.stress
+            Stress(world, count, lanes, floor=True, seed=self.seed)
+        return world
+
+    def save(self, path, world):
+        self.ticks = world.ticks
+        self.result = outcome(world)
+        with open(path, 'w') as file:
+            json.dump({'seed': self.seed, 'masks': self.masks,
+                       'ticks': self.ticks, 'result': self.result,
+                       'inputs': self.inputs, 'stress': self.stress}, file)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as file:
+            data = json.load(file)
+        return cls(data['seed'], data['masks'], data['inputs'], data['ticks'],
+                   data['result'], data.get('stress'))
+
+def outcome(world):
+    # what a replay has to reproduce
+    mario = world.mario
+    return {'high': world.high.top(), 'games': world.high.games,
+            'current': world.current, 'game_on': world.game_on,
+            'speed': world.speed, 'y': mario.rect.y, 'amount': mario.amount,
+            'pipes': [
+                [kind, x, y] for kind, last_x, x, y in world.pipes.sprites()]}
+
+def replay(tape, world, rewind=0):
+    # the whole tape on a world of its own (tape.world()), headless and as
+    # fast as possible; with rewind, every rewind steps the world runs that
+    # far ahead and is put back first
+    while world.ticks < tape.ticks:
+        if rewind and world.ticks % rewind == 0:
+            snapshot, played = world.snapshot(), tape.next
+            for _ in range(min(rewind, tape.ticks - world.ticks)):
+                tape.play(world)
+                world.step()
+            world.restore(snapshot)
+            tape.next = played
+        tape.play(world)
+        world.step()
+        world.sounds.clear()
+    # inputs that came after the last step
+    tape.play(world)
+    return world
+
+if __name__ == '__main__':
+    tape = Tape.load(sys.argv[1])
+    rewind = 0
+    for arg in sys.argv[2:]:
+        if arg.startswith('--rewind='):
+            rewind = int(arg.split('=', 1)[1])
+    if rewind and tape.stress:
+        # the stress pipes come from a generator of their own, which is not
+        # part of a snapshot
+        sys.exit('--rewind cannot replay a tape recorded with --stress')
+    # pygame and the masks are loaded before the clock starts
+    world = tape.world()
+    start = time.perf_counter()
+    replay(tape, world, rewind)
+    seconds = time.perf_counter() - start
+
+    print('{} steps in {:.3f} s, {:.0f} steps per second'
+          .format(world.ticks, seconds, world.ticks / seconds))
+    print('{} games, best scores {}'.format(world.high.games,
+                                            world.high.top()))
+    if outcome(world) == tape.result:
+        print('same result as the recording')
+    else:
+        print('DIFFERENT result from the recording')
+        sys.exit(1)
@@ -0,0 +1,102 @@
+# Mario
+# Date: 18 / oct / 2026
+
+"""
+High scores kept on disk. The table in memory holds the best scores of every
+game ever played on this machine; each new score goes into it at once and is
+handed to a writer thread, which appends it to a log file, one score per
+line. Once the log holds many more lines than the table, the writer
+rewrites it with the table alone (written aside, then renamed over the old
+one), so the file stays small and a crash leaves either log whole. Nothing
+on the frame path ever touches the disk.
+"""
+
+import os
+import queue
+import threading
+
+from simulation import HIGH_SCORES, HighScores
+
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scores.log')
+
+# lines the log may hold, as many times the table, before compaction
+COMPACT = 8
+
+""" Score log object """
+class ScoreLog():
+    def __init__(self, path=PATH, keep=HIGH_SCORES):
+        # without a path the table is only kept in memory
+        self.path = path
+        scores = self.read() if path else []
+        self.table = HighScores(keep, scores)
+
+        # the writer keeps its own table of what is on disk, for compaction
+        self.written = HighScores(keep, scores)
+        self.lines = len(scores)
+        self.queue = queue.Queue()
+        self.thread = None
+        if path:
+            self.thread = threading.Thread(target=self.write_all, daemon=True)
+            self.thread.start()
+
+    @property
+    def best(self):
+        return self.table.best
+
+    def read(self):
+        # every score of the log; a line cut short by a crash is skipped
+        if not os.path.exists(self.path):
+            return []
+        scores = []
+        with open(self.path) as file:
+            for line in file:
+                try:
+                    scores.append(int(line))
+                except ValueError:
+                    pass
+        return scores
+
+    def add(self, score):
+        # into the table now, onto the disk later
+        self.table.add(score)
+        if self.thread:
+            self.queue.put(score)
+
+    def write_all(self):
+        while True:
+            scores = [self.queue.get()]
+            # whatever else came meanwhile goes in the same write
+            while not self.queue.empty():
+                scores.append(self.queue.get())
+            done = None in scores
+            scores = [score for score in scores if score is not None]
+            if scores:
+                self.append(scores)
+            if done:
+                return
+
+    def append(self, scores):
+        with open(self.path, 'a') as file:
+            file.write(''.join('{}\n'.format(score) for score in scores))
+        for score in scores:
+            self.written.add(score)
+        self.lines += len(scores)
+        if self.lines > COMPACT * self.written.keep:
+            self.compact()
+
+    def compact(self):
+        # the table alone replaces the log
+        scores = self.written.top()
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as file:
+            file.write(''.join('{}\n'.format(score) for score in scores))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+        self.lines = len(scores)
+
+    def close(self):
+        # the scores still queued are written before leaving
+        if self.thread:
+            self.queue.put(None)
+            self.thread.join(timeout=2)
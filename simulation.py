@@ -0,0 +1,519 @@
+# Mario
+# Date: 18 / oct / 2026
+
+"""
+The rules of the game without pygame: Mario's physics, the pipes, the score
+and the difficulty stages. Nothing in here touches SDL, so a world can be
+created and stepped in processes that never draw anything. The pygame front
+end (mario.py) feeds the keys and the timer events in and draws the result.
+"""
+
+import heapq
+import random
+from collections import deque, namedtuple
+
+""" Game variables """
+WIDTH, HEIGHT = 1024, 512           # screen dimensions
+INIT_SPEED = 9                      # initial stage speed
+FLOOR_TOP = HEIGHT - 64             # vertical position of the floor top
+MARIO_TOP = FLOOR_TOP - 32          # vertical position of Mario's head
+MARIO_X = 128                       # horizontal position of Mario
+HOP = 10                            # Mario's hop increment
+GRAVITY = 0.60                      # Mario's gravity
+FACTOR = 5                          # gravity factor once the key is released
+DAMPENING = 0.25                    # sprite refreshment dampening factor
+PIPE_FREQ = 700                     # 700 is 0.7 seconds
+SCORE_FREQ = 100                    # 100 is 0.1 seconds
+RATE = 120                          # steps per second the game is tuned for
+PIPE_TICKS = PIPE_FREQ * RATE // 1000      # steps between pipe events
+SCORE_TICKS = SCORE_FREQ * RATE // 1000    # steps between score events
+
+# difficulty stages, the speed goes up by one at each of these scores
+STAGES = (100, 500, 1000)
+
+# scores kept in a high score table
+HIGH_SCORES = 10
+
+# image files and their sizes, a pipe's kind is its index in PIPE_IMAGES
+MARIO_SIZE = (32, 32)
+SPRITES = 3
+PIPE_IMAGES = ("pipe_small.png", "pipe_twins.png", "pipe_big.png",
+               "pipe_cluster.png")
+PIPE_SIZES = ((29, 32), (55, 32), (44, 48), (117, 48))
+HALF = max(w // 2 for w, h in PIPE_SIZES)  # widest pipe, left of its center
+TALLEST = max(h for w, h in PIPE_SIZES)     # tallest pipe, above its bottom
+
+# every image and sound file of the game
+IMAGES = PIPE_IMAGES + ("walk1.png", "walk2.png", "walk3.png", "dead.png",
+                        "floor.png", "background.png")
+SOUNDS = {'jump': 'jump.wav', 'crash': 'crash.wav'}
+
+def to_pixel(value):
+    # pygame rounds halves away from zero when a float lands in a Rect
+    if value < 0:
+        return -int(-value + 0.5)
+    return int(value + 0.5)
+
+""" Box object """
+class Box():
+    # the bits of pygame.Rect the rules need
+    def __init__(self, x, y, w, h):
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+
+    @property
+    def right(self):
+        return self.x + self.w
+
+    @property
+    def bottom(self):
+        return self.y + self.h
+
+    def colliderect(self, other):
+        return (self.x < other.x + other.w and other.x < self.x + self.w and
+                self.y < other.y + other.h and other.y < self.y + self.h)
+
+""" Mario object """
+class Mario():
+    def __init__(self):
+        # pose is 'run', 'airborne' or 'dead', frame picks the running sprite
+        self.pose = 'run'
+        self.frame = 0
+
+        # current rect
+        self.rect = Box(MARIO_X, MARIO_TOP, *MARIO_SIZE)
+        # position before the last step
+        self.last_y = self.rect.y
+
+        # jumping state
+        self.jumping = False
+
+        # bounce opportunity
+        self.bounce = True
+
+        # hop increment
+        self.hop = HOP
+
+        # vertical movement amount
+        self.amount = 0
+
+        # gravity
+        self.gravity = GRAVITY
+
+        # gravity factor
+        self.factor = FACTOR
+
+    def run(self):
+        # keep Mario on the ground while running, gravity is trying
+        # to pull him down!
+        self.rect.y = MARIO_TOP
+
+        # increase frame rate slowly:
+        self.frame += DAMPENING
+
+        # if you run out of sprites, choose the first one again
+        if self.frame >= SPRITES:
+            self.frame = int(0)
+        self.pose = 'run'
+
+    def swoosh(self):
+        # pull Mario down by moving the rectangle downwards
+        self.amount += self.gravity
+        self.rect.y = to_pixel(self.rect.y + self.amount)
+
+    def jump(self):
+        self.jumping = True
+        self.pose = 'airborne'
+        self.amount = 0
+        self.amount -= self.hop
+
+    def land(self):
+        self.jumping = False
+        self.amount = 0
+        self.rect.y = MARIO_TOP
+        self.frame = int(0)
+        self.pose = 'run'
+
+""" Pipe object """
+class Pipe():
+    def __init__(self, kind, x=WIDTH, bottom=FLOOR_TOP):
+        # kind is the index of the image in PIPE_IMAGES
+        self.kind = kind
+        w, h = PIPE_SIZES[kind]
+        # midbottom=(x, bottom), on the floor at the right edge by default
+        self.rect = Box(x - w // 2, bottom - h, w, h)
+        # position before the last step
+        self.last_x = self.rect.x
+
+""" Pipes object """
+class Pipes():
+    # the pipes in flight, one Pipe object each; obstacles.PipeArrays
+    # keeps the same pipes in NumPy arrays instead.
+    # Every pipe is born centered on the right edge and all of them move
+    # at the same speed, so the queue is always sorted by center, the
+    # oldest pipe at the front. A narrow pipe can leave the screen before a
+    # wide one ahead of it, so pipes leave by their right edge (see cull).
+    # Pipes placed anywhere else have to be added from left to right.
+    def __init__(self):
+        self.items = deque()
+        # bottom -> the pipes standing on it that are not behind Mario yet,
+        # in the same order; only the lanes Mario reaches are looked at
+        self.lanes = {}
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, kind, x=WIDTH, bottom=FLOOR_TOP):
+        pipe = Pipe(kind, x, bottom)
+        self.items.append(pipe)
+        if bottom not in self.lanes:
+            self.lanes[bottom] = deque()
+        self.lanes[bottom].append(pipe)
+
+    def remember(self):
+        for pipe in self.items:
+            pipe.last_x = pipe.rect.x
+
+    def move(self, speed):
+        for pipe in self.items:
+            pipe.rect.x -= speed
+
+        # pipes disappear as soon as they are entirely out of the screen,
+        # from their lane too: the lanes Mario never reaches are not trimmed
+        # by hits()
+        for queue in (self.items,) + tuple(self.lanes.values()):
+            cull(queue, 0)
+
+    def clear(self):
+        self.items.clear()
+        self.lanes.clear()
+
+    def hits(self, rect, exact=None):
+        # number of pipes overlapping rect; exact(kind, x, y) has the last
+        # word on the pipes whose rects overlap
+        count = 0
+        for bottom, lane in self.lanes.items():
+            # a lane above or below rect, whatever its pipes
+            if bottom <= rect.y or bottom - TALLEST >= rect.bottom:
+                continue
+            # pipes only ever move left and rect (Mario) stays where it is,
+            # so the pipes behind it leave the lane for good
+            cull(lane, rect.x)
+            for pipe in lane:
+                # this pipe and all the ones after it start right of rect
+                if pipe.rect.x + pipe.rect.w // 2 - HALF >= rect.right:
+                    break
+                if rect.colliderect(pipe.rect):
+                    if exact is None or exact(pipe.kind, pipe.rect.x,
+                                              pipe.rect.y):
+                        count += 1
+        return count
+
+    def sprites(self):
+        # (kind, last x, x, y) of every pipe, for drawing
+        return [(pipe.kind, pipe.last_x, pipe.rect.x, pipe.rect.y)
+                for pipe in self.items]
+
+    def state(self):
+        # the pipes as plain numbers, the same for every store
+        return tuple((pipe.kind, pipe.last_x, pipe.rect.x, pipe.rect.y)
+                     for pipe in self.items)
+
+    def restore(self, state):
+        self.clear()
+        for kind, last_x, x, y in state:
+            pipe = Pipe(kind)
+            pipe.last_x, pipe.rect.x, pipe.rect.y = last_x, x, y
+            self.items.append(pipe)
+            bottom = pipe.rect.bottom
+            if bottom not in self.lanes:
+                self.lanes[bottom] = deque()
+            self.lanes[bottom].append(pipe)
+
+def cull(queue, edge):
+    # drop the pipes of a queue sorted by center whose right edge is at or
+    # left of edge. All of them are centered left of edge, at the front,
+    # where a narrow pipe may sit behind a wide one that stays
+    kept = []
+    while queue and queue[0].rect.x + queue[0].rect.w // 2 < edge:
+        pipe = queue.popleft()
+        if pipe.rect.right > edge:
+            kept.append(pipe)
+    queue.extendleft(reversed(kept))
+
+""" High scores object """
+class HighScores():
+    # the best scores of the games played, at most keep of them, in a heap
+    # with the lowest on top: a score that does not make the table costs a
+    # single comparison. The best one is kept aside, so reading it is free
+    def __init__(self, keep=HIGH_SCORES, scores=()):
+        self.keep = keep
+        self.heap = []
+        self.best = 0
+        # games added so far and the score of the last one
+        self.games = 0
+        self.last = 0
+        for score in scores:
+            self.add(score)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def add(self, score):
+        self.games += 1
+        self.last = score
+        if len(self.heap) < self.keep:
+            heapq.heappush(self.heap, score)
+        elif score > self.heap[0]:
+            heapq.heapreplace(self.heap, score)
+        if score > self.best:
+            self.best = score
+
+    def top(self):
+        # the table, best first
+        return sorted(self.heap, reverse=True)
+
+    def state(self):
+        return (tuple(self.heap), self.best, self.games, self.last)
+
+    def restore(self, state):
+        heap, self.best, self.games, self.last = state
+        # the tuple is already in heap order
+        self.heap = list(heap)
+
+""" Scheduler object """
+class Scheduler():
+    def __init__(self):
+        # (step, order, period, action), the earliest step first; order
+        # keeps actions due on the same step in the order they were added
+        self.queue = []
+        self.order = 0
+        # order -> (period, action), to put the queue back from a state
+        self.actions = {}
+
+    def every(self, period, action, start=None):
+        # run action every period steps, the first time at step start
+        if start is None:
+            start = period
+        heapq.heappush(self.queue, (start, self.order, period, action))
+        self.actions[self.order] = (period, action)
+        self.order += 1
+
+    def run(self, tick):
+        # run every action due at or before this step
+        while self.queue and self.queue[0][0] <= tick:
+            due, order, period, action = heapq.heappop(self.queue)
+            heapq.heappush(self.queue, (due + period, order, period, action))
+            action()
+
+    def state(self):
+        # (step, order) of every action; actions are known by their order,
+        # so the state fits any scheduler that added the same ones
+        return tuple((due, order) for due, order, period, action
+                     in self.queue)
+
+    def restore(self, state):
+        # actions this scheduler does not have are left out
+        actions = self.actions
+        self.queue = [(due, order) + actions[order] for due, order in state
+                      if order in actions]
+        heapq.heapify(self.queue)
+
+""" Snapshot object """
+# everything a world is made of at the end of a step, in plain numbers and
+# tuples: no Surface, no Sound and nothing shared with the world, so taking
+# and restoring one is a few microseconds. It can be restored into another
+# world made the same way, with or without masks or NumPy pipes, which is
+# how a world is planned ahead of. random is (spawns, random state),
+# mario is (pose, frame, x, y, last y, jumping, bounce, amount), pipes is
+# (kind, last x, x, y) per pipe
+Snapshot = namedtuple('Snapshot', (
+    'ticks', 'random', 'count', 'xloc', 'last_xloc', 'best', 'current',
+    'switch', 'speed', 'game_on', 'sounds', 'mario', 'pipes', 'high',
+    'scheduler'))
+
+""" World object """
+class World():
+    def __init__(self, seed=None, pipes=None, masks=None):
+        self.random = random.Random(seed)
+        self.mario = Mario()
+        # any store with the methods of Pipes
+        self.pipes = Pipes() if pipes is None else pipes
+        # pixel-accurate collision (masks.Masks), rects only when None
+        self.masks = masks
+
+        # pipes created so far, it is never reset
+        self.count = 0
+
+        # floor position, now and before the last step
+        self.xloc = 0
+        self.last_xloc = 0
+
+        # score, and the best ones of the games played
+        self.high = HighScores()
+        self.best = 0
+        self.current = 0
+        self.switch = True
+
+        self.speed = INIT_SPEED
+        self.game_on = True
+
+        # simulation frames run so far
+        self.ticks = 0
+
+        # only spawn draws random numbers, and always the same ones from the
+        # same state, so the number of spawns tells the random state; the
+        # state itself is only copied when a snapshot needs a new one
+        self.draws = 0
+        self.drawn = None
+
+        # pipes and points come on simulation steps, not on the wall clock,
+        # so the game plays the same at any speed
+        self.scheduler = Scheduler()
+        self.scheduler.every(PIPE_TICKS, self.spawn)
+        self.scheduler.every(SCORE_TICKS, self.point)
+
+        # names of the sounds to play, emptied by whoever plays them
+        self.sounds = []
+
+    def spawn(self):
+        if not self.game_on:
+            return
+        self.draws += 1
+        # 50% probability of pipe creation
+        if not self.random.choice((1, 0)):
+            return
+        # even pipes choose from the four different pipes, odd pipes
+        # choose from all pipes but the big cluster
+        if not self.count % 2:
+            kind = self.random.choice((0, 1, 2, 3))
+        else:
+            kind = self.random.choice((0, 1, 2, 0))
+        self.pipes.add(kind)
+        self.count += 1
+
+    def point(self):
+        if not self.game_on:
+            return
+        self.current += 1
+        # increase difficulty every certain points
+        if self.current in STAGES:
+            self.speed += 1
+
+    def snapshot(self):
+        if self.drawn is None or self.drawn[0] != self.draws:
+            self.drawn = (self.draws, self.random.getstate())
+        mario = self.mario
+        return Snapshot(
+            self.ticks, self.drawn, self.count, self.xloc,
+            self.last_xloc, self.best, self.current, self.switch, self.speed,
+            self.game_on, len(self.sounds),
+            (mario.pose, mario.frame, mario.rect.x, mario.rect.y, mario.last_y,
+             mario.jumping, mario.bounce, mario.amount),
+            self.pipes.state(), self.high.state(), self.scheduler.state())
+
+    def restore(self, snapshot):
+        # back to the step the snapshot was taken on; the sounds asked for
+        # since then are forgotten
+        (self.ticks, drawn, self.count, self.xloc, self.last_xloc, self.best,
+         self.current, self.switch, self.speed, self.game_on, sounds,
+         mario, pipes, high, scheduler) = snapshot
+        # the random state only has to be set again when spawns ran since
+        # it was copied, or when it comes from another world
+        if drawn is not self.drawn or drawn[0] != self.draws:
+            self.random.setstate(drawn[1])
+            self.draws, self.drawn = drawn[0], drawn
+        del self.sounds[sounds:]
+        m = self.mario
+        (m.pose, m.frame, m.rect.x, m.rect.y, m.last_y, m.jumping, m.bounce,
+         m.amount) = mario
+        self.pipes.restore(pipes)
+        self.high.restore(high)
+        self.scheduler.restore(scheduler)
+
+    def press(self):
+        mario = self.mario
+        # Mario is running, you've just pressed the space bar!
+        if not mario.jumping:
+            self.sounds.append('jump')
+            mario.jump()
+            mario.bounce = True
+
+        # You died! You want to play again and press the space bar!
+        if not self.game_on:
+            self.game_on = True
+            self.switch = True
+            self.speed = INIT_SPEED
+
+    def release(self):
+        # gravity is magnified in order to bring Mario down faster
+        mario = self.mario
+        mario.amount += mario.factor * mario.gravity
+        # deactivate the bounce option
+        mario.bounce = False
+
+    def step(self):
+        self.scheduler.run(self.ticks)
+
+        # positions before this step, so that the front end can draw
+        # anywhere in between two steps
+        self.last_xloc = self.xloc
+        self.mario.last_y = self.mario.rect.y
+        self.pipes.remember()
+
+        # floor: move to the left, reset when it disappears
+        if self.game_on:
+            self.xloc -= self.speed
+            if self.xloc <= -WIDTH:
+                self.xloc = 0
+
+        # the last score is added only once, right after game over
+        if not self.game_on and self.switch:
+            self.high.add(self.current)
+            self.best = self.high.best
+            self.current = 0
+            self.switch = False
+
+        # pipes move, or all vanish after Mario dies, otherwise you
+        # will crash against the same pipe as soon as you resume
+        if self.game_on:
+            self.pipes.move(self.speed)
+        else:
+            self.pipes.clear()
+
+        self.collide()
+        if self.game_on:
+            self.move()
+        self.ticks += 1
+
+    def collide(self):
+        mario = self.mario
+        # one crash for every pipe Mario runs into
+        exact = self.masks.exact(mario) if self.masks else None
+        hits = self.pipes.hits(mario.rect, exact)
+        if hits:
+            self.sounds.extend(['crash'] * hits)
+            self.game_on = False
+            mario.jumping = False
+            mario.pose = 'dead'
+
+    def move(self):
+        mario = self.mario
+        # pull Mario down
+        mario.swoosh()
+
+        if not mario.jumping:
+            mario.run()
+        # if jumping, going down and Mario's head reached its original
+        # position, either jump again right away (bounce) or run
+        elif mario.amount > 0 and mario.rect.y >= MARIO_TOP:
+            if mario.bounce:
+                self.sounds.append('jump')
+                mario.jump()
+            else:
+                mario.land()
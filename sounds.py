@@ -0,0 +1,95 @@
+# Mario
+# Date: 18 / oct / 2026
+
+"""
+Shared sound bank. Each clip is decoded once per process, into the format
+the mixer was opened with, and every player asks the bank for the very same
+Sound. Decoding can wait until a clip is first played or be handed to a
+background thread at startup, so crash.wav no longer delays the first frame.
+With an asset bundle (bundle.py) the samples are taken from its mapping.
+"""
+
+import os
+import threading
+import time
+
+import pygame
+
+# files are found next to the game, wherever it is started from
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+""" Sound bank """
+class SoundBank():
+    def __init__(self):
+        # decoded clips, and the threads still decoding some of them
+        self.sounds = {}
+        self.loading = {}
+        # seconds spent decoding each clip
+        self.decode_time = {}
+        self.lock = threading.Lock()
+        # memory-mapped bundle of decoded clips, if there is one
+        self.bundle = None
+
+    def use(self, bundle):
+        self.bundle = bundle
+
+    def decode(self, name):
+        start = time.perf_counter()
+        sound = None
+        if self.bundle and name in self.bundle:
+            sound = self.bundle.sound(name)
+        if sound is None:
+            # the mixer converts the file to its own rate, size and channels
+            sound = pygame.mixer.Sound(os.path.join(HERE, name))
+        with self.lock:
+            self.sounds[name] = sound
+            self.decode_time[name] = time.perf_counter() - start
+
+    def preload(self, names):
+        # decode the clips in a background thread, right away
+        with self.lock:
+            names = [name for name in names
+                     if name not in self.sounds and name not in self.loading]
+            if not names:
+                return
+            thread = threading.Thread(target=self.decode_all, args=(names,),
+                                      daemon=True)
+            for name in names:
+                self.loading[name] = thread
+        thread.start()
+
+    def decode_all(self, names):
+        for name in names:
+            self.decode(name)
+
+    def sound(self, name):
+        # the clip, decoded now if nobody did it before
+        thread = self.loading.pop(name, None)
+        if thread is not None:
+            thread.join()
+        if name not in self.sounds:
+            self.decode(name)
+        return self.sounds[name]
+
+    def play(self, name):
+        self.sound(name).play()
+
+    def resident(self):
+        # bytes of decoded audio held by the bank
+        frequency, size, channels = pygame.mixer.get_init()
+        sample = abs(size) // 8 * channels
+        with self.lock:
+            sounds = list(self.sounds.values())
+        return sum(round(sound.get_length() * frequency) * sample
+                   for sound in sounds)
+
+    def report(self):
+        with self.lock:
+            lines = ['{:<18} decode {:7.2f} ms'.format(name, seconds * 1000)
+                     for name, seconds in self.decode_time.items()]
+        lines.append('{:<18} {:.0f} KB of audio resident'
+                     .format('', self.resident() / 1024))
+        return '\n'.join(lines)
+
+""" Shared bank """
+bank = SoundBank()
@@ -0,0 +1,186 @@
+# Mario
+# Date: 18 / oct / 2026
+
+"""
+Obstacle stress test. A Stress keeps a given number of pipes in flight by
+spawning several of them on every step, in extra lanes above Mario's head
+where he never runs into them, so the game goes on while the engine moves,
+culls, collides and draws them all. The sweep times simulation and drawing
+per step from 10 to 10,000 pipes for each core and prints the scaling curve:
+
+    python stress.py --cores=classes,numpy,ecs --ticks=240 --out=stress.json
+    python mario.py --stress=2000 --lanes=6     # the same, on screen
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+from simulation import (WIDTH, HEIGHT, FLOOR_TOP, PIPE_SIZES, PIPE_IMAGES,
+                        SCORE_TICKS, Scheduler)
+from bench import summary
+from options import option
+
+# bottom of every extra lane, all of them out of reach of Mario's jump
+LANES = (80, 128, 176, 224, 272, 320)
+
+COUNTS = (10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+CORES = ('classes', 'numpy', 'ecs')
+
+# what a step can take at 120 frames per second, in milliseconds
+BUDGET = 1000 / 120
+
+# pixels a pipe travels from its birth until it is culled, on average
+TRAVEL = WIDTH + sum(w for w, h in PIPE_SIZES) / len(PIPE_SIZES) / 2
+
+""" Stress object """
+class Stress():
+    def __init__(self, world, count, lanes=len(LANES), floor=False, seed=0):
+        self.world = world
+        self.count = count
+        self.lanes = LANES[:lanes]
+        self.random = random.Random(seed)
+        # pipes owed to keep count in flight, spawned once they make a whole
+        self.owed = 0.0
+
+        # without the floor lane the game's own pipes are not spawned
+        if not floor:
+            world.scheduler = Scheduler()
+            world.scheduler.every(SCORE_TICKS, world.point)
+        world.scheduler.every(1, self.spawn, start=0)
+
+        # the screen starts full, from left to right as the stores want it
+        for i in range(count):
+            self.add(i * WIDTH // count)
+
+    def add(self, x=WIDTH):
+        kind = self.random.randrange(len(PIPE_IMAGES))
+        bottom = self.random.choice(self.lanes)
+        if hasattr(self.world, 'add_pipe'):
+            self.world.add_pipe(kind, x, bottom)
+        else:
+            self.world.pipes.add(kind, x, bottom)
+
+    def spawn(self):
+        # a pipe lives TRAVEL / speed steps, replace count of them in that time
+        if not self.world.game_on:
+            return
+        self.owed += self.count * self.world.speed / TRAVEL
+        while self.owed >= 1:
+            self.add()
+            self.owed -= 1
+
+def alive(world):
+    # pipes in flight, in either core
+    if hasattr(world, 'archetypes'):
+        return len(world.archetypes['pipe'])
+    return len(world.pipes)
+
+""" Sweep """
+def make(core, seed):
+    if core == 'ecs':
+        import ecs
+        return ecs.World(seed)
+    import simulation
+    if core == 'numpy':
+        from obstacles import PipeArrays
+        return simulation.World(seed, pipes=PipeArrays())
+    return simulation.World(seed)
+
+def painter():
+    # draw(world) blits a whole frame onto a display surface, like mario.py
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    from assets import assets
+    import ecs
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    images = {name: assets.image(name) for name in ecs.IMAGES}
+    images["background.png"] = assets.image("background.png", alpha=False)
+    background = images["background.png"]
+    pipes = [images[name] for name in PIPE_IMAGES]
+
+    def draw(world):
+        if hasattr(world, 'archetypes'):
+            blits = [(images[name], (x, y))
+                     for name, x, y in ecs.render(world)]
+        else:
+            blits = [(background, (0, 0)),
+                     (images["floor.png"], (world.xloc, FLOOR_TOP)),
+                     (images["floor.png"], (world.xloc + WIDTH, FLOOR_TOP))]
+            blits.extend((pipes[kind], (x, y))
+                         for kind, last_x, x, y in world.pipes.sprites())
+            mario = world.mario
+            blits.append((images["walk1.png"], (mario.rect.x, mario.rect.y)))
+        screen.blits(blits, doreturn=False)
+    return draw
+
+def measure(core, count, ticks, warmup, lanes, draw, seed=0):
+    world = make(core, seed)
+    Stress(world, count, lanes, seed=seed)
+    sim, render, entities = [], [], 0
+    for tick in range(warmup + ticks):
+        start = time.perf_counter()
+        world.step()
+        world.sounds.clear()
+        middle = time.perf_counter()
+        if draw is not None:
+            draw(world)
+        end = time.perf_counter()
+        if tick >= warmup:
+            sim.append(middle - start)
+            render.append(end - middle)
+            entities += alive(world)
+    if not world.game_on:
+        raise RuntimeError('Mario ran into a stress lane')
+    return {'count': count, 'entities': entities / ticks,
+            'sim': summary(sim), 'render': summary(render)}
+
+def curve(core, results):
+    # one line per count, with a bar of the step time against the budget
+    lines = ['{}'.format(core),
+             '{:>7}{:>9}{:>10}{:>10}{:>10}{:>9}'.format(
+                 'count', 'alive', 'sim p50', 'draw p50', 'p95 ms',
+                 'us/pipe')]
+    cliff = None
+    for result in results:
+        sim, render = result['sim'], result['render']
+        total = sim['p50'] + render['p50']
+        p95 = sim['p95'] + render['p95']
+        per = total * 1000 / max(result['entities'], 1)
+        bar = '#' * min(40, int(total / BUDGET * 10))
+        lines.append('{:>7}{:>9.0f}{:>10.3f}{:>10.3f}{:>10.3f}{:>9.2f}  {}'
+                     .format(result['count'], result['entities'],
+                             sim['p50'], render['p50'], p95, per, bar))
+        if cliff is None and p95 > BUDGET:
+            cliff = result['count']
+    if cliff is None:
+        lines.append('every count fits in {:.2f} ms'.format(BUDGET))
+    else:
+        lines.append('over the {:.2f} ms budget from {} pipes'
+                     .format(BUDGET, cliff))
+    return '\n'.join(lines)
+
+if __name__ == '__main__':
+    ticks = option('ticks', 240)
+    warmup = option('warmup', 60)
+    lanes = option('lanes', len(LANES))
+    cores = option('cores', ','.join(CORES)).split(',')
+    counts = [int(count) for count in
+              option('counts', ','.join(map(str, COUNTS))).split(',')]
+    draw = None if '--no-draw' in sys.argv else painter()
+
+    results = {}
+    for core in cores:
+        results[core] = [measure(core, count, ticks, warmup, lanes, draw)
+                         for count in counts]
+        print(curve(core, results[core]))
+        print()
+
+    out = option('out', '')
+    if out:
+        with open(out, 'w') as file:
+            json.dump(results, file, indent=2)
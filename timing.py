@@ -0,0 +1,104 @@
+# Mario
+# Date: 18 / oct / 2026
+
+"""
+Per-stage frame timings. The main loop marks the end of each of its stages;
+the time since the previous mark is kept in a rolling window per stage, from
+which p50, p95, p99 and max are worked out on demand. When disabled, a mark
+costs a single attribute test. The startup timeline marks the steps from
+launch to the first frame.
+"""
+
+import json
+import time
+from array import array
+
+""" Timings object """
+class Timings():
+    def __init__(self, enabled=True, window=1024):
+        self.enabled = enabled
+        self.window = window
+        # rolling window of seconds per stage, and the next slot to write
+        self.samples = {}
+        self.slot = {}
+        # frames seen, and when the current stage started
+        self.frames = 0
+        self.last = time.perf_counter()
+
+    def start(self):
+        # beginning of a frame
+        if self.enabled:
+            self.last = time.perf_counter()
+
+    def mark(self, stage):
+        # end of a stage, it took the time since the previous mark
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if stage not in self.samples:
+            self.samples[stage] = array('d')
+            self.slot[stage] = 0
+        samples = self.samples[stage]
+        if len(samples) < self.window:
+            samples.append(now - self.last)
+        else:
+            samples[self.slot[stage]] = now - self.last
+            self.slot[stage] = (self.slot[stage] + 1) % self.window
+        self.last = now
+
+    def end(self):
+        # end of a frame
+        if self.enabled:
+            self.frames += 1
+
+    def stats(self):
+        # {stage: (p50, p95, p99, max)} in milliseconds, stages in the order
+        # they were first marked
+        stats = {}
+        for stage, samples in self.samples.items():
+            ordered = sorted(samples)
+            last = len(ordered) - 1
+            stats[stage] = tuple(ordered[int(last * p)] * 1000
+                                 for p in (0.50, 0.95, 0.99, 1.0))
+        return stats
+
+    def lines(self):
+        # the stats as text, one line per stage
+        lines = ['{:<11}{:>7}{:>7}{:>7}{:>7}'.format('ms', 'p50', 'p95',
+                                                     'p99', 'max')]
+        for stage, values in self.stats().items():
+            lines.append('{:<11}{:7.2f}{:7.2f}{:7.2f}{:7.2f}'
+                         .format(stage, *values))
+        return lines
+
+    def dump(self, path):
+        # summary file, written on exit; the overlay enables the timings
+        # without asking for one
+        if not self.enabled or not path:
+            return
+        stats = self.stats()
+        summary = {'frames': self.frames, 'window': self.window,
+                   'stages': {stage: dict(zip(('p50', 'p95', 'p99', 'max'),
+                                              values))
+                              for stage, values in stats.items()}}
+        with open(path, 'w') as file:
+            json.dump(summary, file, indent=2)
+
+""" Startup timeline """
+class Timeline():
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks = []
+
+    def mark(self, label):
+        # milliseconds since the timeline started
+        self.marks.append((label, (time.perf_counter() - self.start) * 1000))
+
+    def report(self):
+        lines = []
+        previous = 0
+        for label, millis in self.marks:
+            lines.append('{:<20}{:9.2f} ms  (+{:.2f})'
+                         .format(label, millis, millis - previous))
+            previous = millis
+        return '\n'.join(lines)
@@ -0,0 +1,197 @@
+# Mario
+# Date: 18 / oct / 2026
+
+"""
+Many games at once, stored in NumPy arrays, one row per game. A single call
+to step() advances every game with the rules of simulation.py, so the cost
+per game is a few array operations instead of a trip through World.step.
+
+    env = VecEnv(256, seed=0)
+    obs = env.reset()
+    obs, reward, done = env.step(actions)   # actions: 1 holds the space bar
+
+A game that ends is started again right away, its last observation is kept
+in env.final. Pipes come from one random.Random per game seeded exactly like
+World(seed), so game i plays the same pipes as World(seed + i).
+"""
+
+import random
+
+import numpy as np
+
+from simulation import (INIT_SPEED, MARIO_TOP, DAMPENING, SPRITES, STAGES,
+                        MARIO_SIZE, PIPE_TICKS, SCORE_TICKS, WIDTH, FLOOR_TOP,
+                        MARIO_X, HOP, GRAVITY, FACTOR)
+from obstacles import WIDTHS, HEIGHTS
+
+# nearest pipes ahead of Mario described in every observation
+AHEAD = 3
+
+def to_pixel(values):
+    # pygame rounds halves away from zero when a float lands in a Rect
+    return np.where(values < 0, -np.floor(-values + 0.5),
+                    np.floor(values + 0.5)).astype(np.int64)
+
+""" Vectorized environment object """
+class VecEnv():
+    def __init__(self, count, seed=0, pipes=8):
+        self.count = count
+        self.seeds = np.arange(seed, seed + count)
+        # room for pipes in flight per game, two or three is the most the
+        # rules allow at any speed
+        self.room = pipes
+
+        # observation size: Mario's state, then three numbers per pipe
+        self.size = 5 + 3 * AHEAD
+
+        self.randoms = [random.Random(int(s)) for s in self.seeds]
+        self.spawned = np.zeros(count, dtype=np.int64)
+        self.held = np.zeros(count, dtype=bool)
+        self.final = np.zeros((count, self.size), dtype=np.float32)
+        self.reset()
+
+    def reset(self, which=None):
+        # start again the games picked by the boolean array which (all of
+        # them by default); their random streams and pipe counts go on,
+        # like when the space bar is pressed after dying
+        if which is None:
+            which = np.ones(self.count, dtype=bool)
+        if not hasattr(self, 'y'):
+            n, p = self.count, self.room
+            self.y = np.zeros(n, dtype=np.int64)
+            self.amount = np.zeros(n, dtype=np.float64)
+            self.frame = np.zeros(n, dtype=np.float64)
+            self.jumping = np.zeros(n, dtype=bool)
+            self.bounce = np.zeros(n, dtype=bool)
+            self.speed = np.zeros(n, dtype=np.int64)
+            self.current = np.zeros(n, dtype=np.int64)
+            self.ticks = np.zeros(n, dtype=np.int64)
+            self.active = np.zeros((n, p), dtype=bool)
+            self.kind = np.zeros((n, p), dtype=np.int64)
+            self.x = np.zeros((n, p), dtype=np.int64)
+            self.w = np.zeros((n, p), dtype=np.int64)
+            self.h = np.zeros((n, p), dtype=np.int64)
+
+        self.y[which] = MARIO_TOP
+        self.amount[which] = 0
+        self.frame[which] = 0
+        self.jumping[which] = False
+        self.bounce[which] = True
+        self.speed[which] = INIT_SPEED
+        self.current[which] = 0
+        self.ticks[which] = 0
+        self.active[which] = False
+        return self.observe()
+
+    def spawn(self, due):
+        # the same random calls as World.spawn, one game at a time; this
+        # only happens once every PIPE_TICKS steps
+        for i in np.flatnonzero(due):
+            rng = self.randoms[i]
+            if not rng.choice((1, 0)):
+                continue
+            if not self.spawned[i] % 2:
+                kind = rng.choice((0, 1, 2, 3))
+            else:
+                kind = rng.choice((0, 1, 2, 0))
+            free = np.flatnonzero(~self.active[i])
+            if not len(free):
+                raise RuntimeError('more than {} pipes in flight'
+                                   .format(self.room))
+            slot = free[0]
+            w, h = WIDTHS[kind], HEIGHTS[kind]
+            self.active[i, slot] = True
+            self.kind[i, slot] = kind
+            # midbottom=(WIDTH, FLOOR_TOP)
+            self.x[i, slot] = WIDTH - w // 2
+            self.w[i, slot] = w
+            self.h[i, slot] = h
+            self.spawned[i] += 1
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=bool)
+
+        # pressing the space bar jumps when running, releasing it pulls
+        # Mario down faster and forbids the bounce
+        press = actions & ~self.held
+        jump = press & ~self.jumping
+        self.jumping[jump] = True
+        self.amount[jump] = 0.0 - HOP
+        self.bounce[jump] = True
+        release = ~actions & self.held
+        self.amount[release] += FACTOR * GRAVITY
+        self.bounce[release] = False
+        self.held = actions
+
+        # pipe and score events, on the steps World's scheduler runs them
+        started = self.ticks > 0
+        due = started & (self.ticks % PIPE_TICKS == 0)
+        if due.any():
+            self.spawn(due)
+        point = started & (self.ticks % SCORE_TICKS == 0)
+        self.current += point
+        self.speed += point & np.isin(self.current, STAGES)
+
+        # pipes move and disappear once entirely out of the screen
+        self.x -= self.speed[:, None] * self.active
+        self.active &= self.x + self.w > 0
+
+        # Mario against every pipe of every game
+        top = self.y[:, None]
+        y = FLOOR_TOP - self.h
+        mw, mh = MARIO_SIZE
+        overlap = (self.active &
+                   (MARIO_X < self.x + self.w) & (self.x < MARIO_X + mw) &
+                   (top < y + self.h) & (y < top + mh))
+        done = overlap.any(axis=1)
+        alive = ~done
+
+        # pull Mario down
+        self.amount[alive] += GRAVITY
+        self.y[alive] = to_pixel(self.y[alive] + self.amount[alive])
+
+        # running
+        run = alive & ~self.jumping
+        self.y[run] = MARIO_TOP
+        self.frame[run] += DAMPENING
+        self.frame[run & (self.frame >= SPRITES)] = 0
+
+        # going down and back to the ground: bounce or land
+        ground = alive & self.jumping & (self.amount > 0) & (self.y >= MARIO_TOP)
+        again = ground & self.bounce
+        self.amount[again] = 0.0 - HOP
+        land = ground & ~self.bounce
+        self.jumping[land] = False
+        self.amount[land] = 0
+        self.y[land] = MARIO_TOP
+        self.frame[land] = 0
+
+        self.ticks += 1
+        reward = point.astype(np.float32)
+
+        # finished games start again, their last observation is kept
+        if done.any():
+            self.final[done] = self.observe()[done]
+            self.reset(done)
+        return self.observe(), reward, done
+
+    def observe(self):
+        # Mario's height above the ground, vertical speed, jumping, bounce
+        # and stage speed, then distance, width and height of the nearest
+        # pipes ahead (WIDTH, 0, 0 when there are fewer)
+        obs = np.zeros((self.count, self.size), dtype=np.float32)
+        obs[:, 0] = MARIO_TOP - self.y
+        obs[:, 1] = self.amount
+        obs[:, 2] = self.jumping
+        obs[:, 3] = self.bounce
+        obs[:, 4] = self.speed
+
+        ahead = self.active & (self.x + self.w > MARIO_X)
+        distance = np.where(ahead, self.x - MARIO_X, WIDTH)
+        order = np.argsort(distance, axis=1)[:, :AHEAD]
+        rows = np.arange(self.count)[:, None]
+        near = ahead[rows, order]
+        obs[:, 5::3] = distance[rows, order]
+        obs[:, 6::3] = np.where(near, self.w[rows, order], 0)
+        obs[:, 7::3] = np.where(near, self.h[rows, order], 0)
+        return obs